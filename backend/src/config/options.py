@@ -49,15 +49,20 @@ class Options:
             "glossy lacquer",
         ]
 
-    def get_options(
-        self,
-    ) -> dict[str, list[str]]:
-        """Return all option categories grouped by attribute type."""
-        options = {
+        # Built once; the catalog is static for the life of the process.
+        self._options_dict = {
             "color_palettes": self.color_palettes,
             "patterns": self.patterns,
             "motifs": self.motifs,
             "themes": self.themes,
             "finishes": self.finishes,
         }
-        return options
+
+    def get_options(
+        self,
+    ) -> dict[str, list[str]]:
+        """
+        Return all option categories grouped by attribute type.
+        The same dict is returned on every call; treat it as read-only.
+        """
+        return self._options_dict
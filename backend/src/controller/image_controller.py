@@ -1,13 +1,14 @@
 """API routes for image generation, streaming, and retrieval."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 
-import io
-from typing import Any
-import traceback
+import time
+import asyncio
+import hashlib
+import orjson
+from typing import Annotated, Any, AsyncIterator, Callable, Dict, Literal, Tuple
 
-from src.config.options import Options
 from src.services.edit_service.editor import Edit
 from src.services.edit_service.main import ImageImpainting as ii
 from src.services.image_generation_service.model import Imagine
@@ -19,36 +20,71 @@ from src.models.generate import (
     RelatedRequest,
 )
 from src.models.edit_image import EditRequest, EditResponse
+from src.utility.cache import LRUCache
 from src.utility.logger import AppLogger
+from src.utility.responses import (
+    MSGPACK_MEDIA_TYPE,
+    MsgPackResponse,
+    ORJSONResponse,
+    bytes_response,
+    etag_matches,
+    not_modified,
+)
 
 router = APIRouter(prefix="/api/image", tags=["Image"])
 logger = AppLogger.get_logger(__name__)
 
+# Services are stateless and built once per process by their cached factories.
+GenerationService = Annotated[Generation, Depends(ig.get_image_generation)]
+EditService = Annotated[Edit, Depends(ii.get_editor)]
+ImagineService = Annotated[Imagine, Depends(ig.get_imagine)]
 
-@router.get("/options")
-async def get_options(
-    service: Options = Depends(ig.get_image_generation_options),
-) -> dict[str, Any]:
+# Image payloads default to WebP; clients that need lossless pass ?format=png.
+ImageFormat = Literal["webp", "png"]
+
+
+# The option catalog is static per process, so its JSON body is built once.
+_OPTIONS_BODY = ORJSONResponse(ig.get_image_generation_options().get_options()).body
+
+
+@router.get("/options", response_model=None)
+async def get_options() -> Response:
     """Return the available design options for clients to render selection UI."""
-    try:
-        options = service.get_options()
-        return options
-    except Exception as e:
-        logger.error(f"Exception Occurred : {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
-        )
+    return Response(content=_OPTIONS_BODY, media_type="application/json")
 
 
-@router.post("/generate", response_model=GenerateResponse)
+# GenerateResponse is only advertised in the OpenAPI schema: the service already
+# returns a validated model, so re-validating megabytes of base64 on the way
+# out is skipped by dumping it straight to an orjson response.
+# Clients sending "Accept: application/msgpack" get the same shape as
+# MessagePack, with each image's bytes under "data" instead of "data_b64".
+@router.post(
+    "/generate",
+    response_model=None,
+    responses={
+        status.HTTP_200_OK: {
+            "model": GenerateResponse,
+            "content": {MSGPACK_MEDIA_TYPE: {}},
+        }
+    },
+)
 async def generate(
+    request: Request,
     payload: GenerateRequest,
-    service: Generation = Depends(ig.get_image_generation),
-) -> GenerateResponse:
+    service: GenerationService,
+    format: ImageFormat = "webp",
+) -> Response:
     """Generate a full set of images for the requested context."""
     try:
-        result = service.generate_image(context=payload)
-        return result
+        # MessagePack carries bytes natively, so images skip base64 entirely.
+        raw = MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+        # Gemini calls and Pillow work are blocking; keep them off the event loop.
+        result = await asyncio.to_thread(
+            service.generate_image, context=payload, fmt=format.upper(), raw=raw
+        )
+        if raw:
+            return MsgPackResponse(content=result)
+        return ORJSONResponse(content=result.model_dump())
     except Exception as e:
         logger.error(f"Exception Occurred : {e}")
         raise HTTPException(
@@ -56,38 +92,82 @@ async def generate(
         )
 
 
+# Events the generator may run ahead of a slow client before it waits.
+_STREAM_BUFFER = 8
+_STREAM_END = object()
+
+
+async def _buffered(
+    stream: AsyncIterator[bytes], maxsize: int = _STREAM_BUFFER
+) -> AsyncIterator[bytes]:
+    """
+    Drain stream into a bounded queue from a background task so generation
+    keeps going while the client reads. The producer is cancelled once the
+    consumer stops (e.g. the client disconnects); its errors re-raise here.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def fill() -> None:
+        """Move stream items into the queue, ending with a marker or the error."""
+        try:
+            async for item in stream:
+                await queue.put(item)
+        except Exception as exc:
+            await queue.put(exc)
+        else:
+            await queue.put(_STREAM_END)
+
+    producer = asyncio.create_task(fill())
+    try:
+        while (item := await queue.get()) is not _STREAM_END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+
+
 @router.post("/generate/stream")
 async def generate_stream(
     payload: GenerateRequest,
-    service: Generation = Depends(ig.get_image_generation),
+    service: GenerationService,
+    format: ImageFormat = "webp",
 ):
     """Stream image generation events so the client can render partial results."""
+    # The service yields one orjson-encoded event per line (NDJSON).
+    stream = service.generate_image_stream(context=payload, fmt=format.upper())
+    return StreamingResponse(
+        _buffered(stream),
+        media_type="application/x-ndjson",
+    )
 
-    async def event_stream():
-        """Yield streaming chunks from the generation service."""
-        async for chunk in service.generate_image_stream(context=payload):
-            yield chunk
-
-    return StreamingResponse(event_stream(), media_type="application/json")
 
-
-@router.post("/edit")
+# Same as /generate: the edited variants are dumped straight to orjson rather
+# than re-validated against EditResponse.
+@router.post(
+    "/edit",
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": EditResponse}},
+)
 async def edit_image(
-    payload: EditRequest, service: Edit = Depends(ii.get_editor)
-) -> EditResponse:
+    payload: EditRequest,
+    service: EditService,
+    format: ImageFormat = "webp",
+) -> ORJSONResponse:
     """
     Edit an existing generated image using Gemini or OpenAI.
     `model` can be 'gemini' or 'openai' (query param).
     """
     try:
-        resp = service.edit_image(payload, model="gemini")
-        return resp
+        resp = await asyncio.to_thread(
+            service.edit_image, payload, model="gemini", fmt=format.upper()
+        )
+        return ORJSONResponse(content=resp.model_dump())
     except HTTPException as he:
         logger.error(f"Exception occurred in edit ep: {he}")
         raise
     except Exception as e:
-        logger.error(f"Edit endpoint error: {e}")
-        traceback.print_exc()
+        logger.exception(f"Edit endpoint error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Unexpected error while editing image.",
@@ -95,12 +175,12 @@ async def edit_image(
 
 
 @router.delete("/delete")
-async def delete_image(image_id: str, service: Imagine = Depends(ig.get_imagine)):
+async def delete_image(image_id: str, service: ImagineService):
     """
     Delete an image given its imageId (stamp).
     """
     try:
-        success = service.delete_image(image_id)
+        success = await asyncio.to_thread(service.delete_image, image_id)
 
         if not success:
             return {"success": False, "error": "Image not found or delete failed"}
@@ -115,13 +195,13 @@ async def delete_image(image_id: str, service: Imagine = Depends(ig.get_imagine)
 
 @router.delete("/delete-all")
 async def delete_all_images(
-    service: Imagine = Depends(ig.get_imagine),
+    service: ImagineService,
 ) -> dict[str, Any]:
     """
     Delete all images and empty the metadata.json file.
     """
     try:
-        result = service.delete_all_images()
+        result = await asyncio.to_thread(service.delete_all_images)
 
         if not result.get("success"):
             # Partial failure (e.g. metadata not cleared)
@@ -144,16 +224,39 @@ async def delete_all_images(
 
 @router.get("/download")
 async def download_image(
+    request: Request,
     image_id: str,
+    service: ImagineService,
     level: str = "org",
-    service: Imagine = Depends(ig.get_imagine),
 ):
     """
     Download an image by id and variant level.
     level ∈ [org, low, med, high]
     """
     try:
-        raw_bytes, mime_type, filename = service.get_image_bytes_for_download(
+        # Stored PNGs go out straight from disk (sendfile, no buffering);
+        # only re-encoded originals and generated variants are held in memory.
+        # Both paths answer Range requests with 206 partial content, and
+        # If-None-Match with 304 before any image is read or generated.
+        etag = await asyncio.to_thread(
+            service.download_etag, image_id=image_id, level=level
+        )
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else {}
+        if etag and etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(cache_headers)
+
+        path, mime_type, filename = await asyncio.to_thread(
+            service.get_image_path_for_download,
+            image_id=image_id,
+            level=level,
+        )
+        if path is not None:
+            return FileResponse(
+                path, media_type=mime_type, filename=filename, headers=cache_headers
+            )
+
+        raw_bytes, mime_type, filename = await asyncio.to_thread(
+            service.get_image_bytes_for_download,
             image_id=image_id,
             level=level,
         )
@@ -164,10 +267,18 @@ async def download_image(
                 detail="Image not found on the server",
             )
 
-        return StreamingResponse(
-            io.BytesIO(raw_bytes),
+        # A stale If-Range validator means the client's partial copy is from
+        # another version, so it gets the whole body instead of a slice.
+        if_range = request.headers.get("if-range")
+        fresh = if_range is None or (etag is not None and if_range == etag)
+        return bytes_response(
+            raw_bytes,
             media_type=mime_type,
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            range_header=request.headers.get("range") if fresh else None,
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                **cache_headers,
+            },
         )
     except FileNotFoundError as exc:
         logger.error(f"File was not found in storage: {exc}")
@@ -176,70 +287,137 @@ async def download_image(
             detail=str(exc),
         ) from exc
     except Exception as e:
-        logger.error(f"Exception occurred while downloading : {e}")
-        traceback.print_exc()
+        logger.exception(f"Exception occurred while downloading : {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
         ) from e
 
 
-@router.get("/recent-images")
+# Serialized gallery pages by route arguments, as (storage version, build time,
+# body, ETag). A save, edit or delete bumps the version; the short TTL covers
+# image files rewritten in place. Pages carry up to 50 base64 images, so the
+# cache is bounded by bytes as well as entries.
+_PAGE_CACHE = LRUCache(
+    maxsize=8, maxbytes=32 * 1024 * 1024, weigh=lambda entry: len(entry[2])
+)
+_PAGE_TTL = 10.0
+
+
+def _cached_page(
+    service: Imagine,
+    key: Tuple,
+    build: Callable[[], Dict[str, Any]],
+    with_etag: bool = True,
+) -> Tuple[bytes, str]:
+    """
+    Return the JSON body for key and its ETag (empty unless with_etag),
+    rebuilding them when stale.
+    """
+    version = service.storage_version()
+    now = time.monotonic()
+    cached = _PAGE_CACHE.get(key)
+    if cached and cached[0] == version and now - cached[1] < _PAGE_TTL:
+        return cached[2], cached[3]
+    body = orjson.dumps(build())
+    etag = (
+        f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"' if with_etag else ""
+    )
+    _PAGE_CACHE.put(key, (version, now, body, etag))
+    return body, etag
+
+
+@router.get("/recent-images", response_model=None)
 async def recent(
+    request: Request,
+    service: ImagineService,
     offset: int = 0,
     limit: int = 9,
-    service: Imagine = Depends(ig.get_imagine),
-) -> dict[str, Any]:
+    format: ImageFormat = "webp",
+) -> Response:
     """Return paged recent images for gallery views."""
     try:
         safe_offset = max(0, offset)
         safe_limit = max(1, min(limit, 50))  # cap at 50 if you want
 
-        items, total = service.load_recent_images(
-            offset=safe_offset,
-            limit=safe_limit,
-        )
-        if total == 0:
-            logger.info("No recent images found")
-            return {"status": False, "message": "No recent image present"}
-        return {
-            "status": True,
-            "items": items,
-            "total": total,
-            "has_more": safe_offset + safe_limit < total,
-            "next_offset": safe_offset + len(items),
-        }
+        def build() -> Dict[str, Any]:
+            """Load one page of recent images as a JSON-ready dict."""
+            items, total = service.load_recent_images(
+                offset=safe_offset,
+                limit=safe_limit,
+                fmt=format.upper(),
+            )
+            if total == 0:
+                logger.info("No recent images found")
+                return {"status": False, "message": "No recent image present"}
+            return {
+                "status": True,
+                "items": [item.model_dump() for item in items],
+                "total": total,
+                "has_more": safe_offset + safe_limit < total,
+                "next_offset": safe_offset + len(items),
+            }
+
+        body, etag = await asyncio.to_thread(
+            _cached_page, service, ("recent", safe_offset, safe_limit, format), build
+        )
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(cache_headers)
+        return Response(
+            content=body, media_type="application/json", headers=cache_headers
+        )
     except Exception as e:
-        logger.error(f"Exception Occurred : {e}")
-        traceback.print_exc()
+        logger.exception(f"Exception Occurred : {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
 
 
-@router.post("/related-images")
+@router.post("/related-images", response_model=None)
 async def related(
     payload: RelatedRequest,
+    service: ImagineService,
     offset: int = 0,
     limit: int = 12,
-    service: Imagine = Depends(ig.get_imagine),
-):
+    format: ImageFormat = "webp",
+) -> Response:
     """Return related images for a generated item with pagination metadata."""
     try:
         safe_offset = max(0, offset)
         safe_limit = max(1, min(limit, 50))
-        items, total = service.find_related_images(
-            payload=payload,
-            limit=safe_limit,
-            offset=safe_offset,
-        )
-        logger.info(f"found {total} related image/s")
-        return {
-            "items": items,
-            "total": total,
-            "has_more": safe_offset + safe_limit < total,
-            "next_offset": safe_offset + len(items),
-        }
+
+        def build() -> Dict[str, Any]:
+            """Find one page of related images as a JSON-ready dict."""
+            items, total = service.find_related_images(
+                payload=payload,
+                limit=safe_limit,
+                offset=safe_offset,
+                fmt=format.upper(),
+            )
+            logger.info(f"found {total} related image/s")
+            return {
+                "items": [item.model_dump() for item in items],
+                "total": total,
+                "has_more": safe_offset + safe_limit < total,
+                "next_offset": safe_offset + len(items),
+            }
+
+        key = (
+            "related",
+            payload.id,
+            payload.theme,
+            payload.type,
+            orjson.dumps(payload.selections, option=orjson.OPT_SORT_KEYS),
+            safe_offset,
+            safe_limit,
+            format,
+        )
+        # POST: If-None-Match cannot yield a 304 here, so no ETag is hashed.
+        body, _ = await asyncio.to_thread(
+            _cached_page, service, key, build, with_etag=False
+        )
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Exception Occurred : {e}")
         raise HTTPException(
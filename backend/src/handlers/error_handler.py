@@ -5,7 +5,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Optional, Dict
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Optional, Dict, Tuple
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
@@ -13,31 +15,184 @@ from src.utility.logger import AppLogger
 
 logger = AppLogger.get_logger(__name__)
 
-try:
-    from openai import (
-        APIError,
-        RateLimitError,
-        APITimeoutError,
-        AuthenticationError,
-        BadRequestError,
-        APIConnectionError,
+
+@lru_cache(maxsize=1)
+def _openai_errors() -> SimpleNamespace:
+    """
+    Import the OpenAI exception classes on first use. The openai package
+    is slow to import and only needed once an OpenAI call has failed.
+    """
+    try:
+        from openai import (
+            APIError,
+            RateLimitError,
+            APITimeoutError,
+            AuthenticationError,
+            BadRequestError,
+            APIConnectionError,
+        )
+    except Exception:
+        APIError = RateLimitError = APITimeoutError = AuthenticationError = BadRequestError = APIConnectionError = Exception  # type: ignore
+    return SimpleNamespace(
+        APIError=APIError,
+        RateLimitError=RateLimitError,
+        APITimeoutError=APITimeoutError,
+        AuthenticationError=AuthenticationError,
+        BadRequestError=BadRequestError,
+        APIConnectionError=APIConnectionError,
     )
-except Exception:
-    APIError = RateLimitError = APITimeoutError = AuthenticationError = BadRequestError = APIConnectionError = Exception  # type: ignore
-
-try:
-    # Gemini / Google generative AI errors
-    from google.api_core.exceptions import (
-        GoogleAPIError,
-        DeadlineExceeded,
-        ResourceExhausted,
-        InvalidArgument,
-        PermissionDenied,
+
+
+@lru_cache(maxsize=1)
+def _google_errors() -> SimpleNamespace:
+    """
+    Import the Gemini / Google API exception classes on first use.
+    google.api_core is only needed once a Gemini call has failed.
+    """
+    try:
+        from google.api_core.exceptions import (
+            GoogleAPIError,
+            DeadlineExceeded,
+            ResourceExhausted,
+            InvalidArgument,
+            PermissionDenied,
+        )
+    except Exception:
+        GoogleAPIError = DeadlineExceeded = ResourceExhausted = InvalidArgument = (
+            PermissionDenied
+        ) = Exception
+    return SimpleNamespace(
+        GoogleAPIError=GoogleAPIError,
+        DeadlineExceeded=DeadlineExceeded,
+        ResourceExhausted=ResourceExhausted,
+        InvalidArgument=InvalidArgument,
+        PermissionDenied=PermissionDenied,
+    )
+
+
+# (status_code, error_type, message) per provider exception class, most
+# specific first; the first entry wins when fallbacks alias the same class.
+_ErrorSpec = Tuple[int, str, str]
+
+
+def _build_map(
+    entries: Tuple[Tuple[type, _ErrorSpec], ...],
+) -> Dict[type, _ErrorSpec]:
+    """Key error specs by exception class, keeping the first spec per class."""
+    table: Dict[type, _ErrorSpec] = {}
+    for cls, spec in entries:
+        table.setdefault(cls, spec)
+    return table
+
+
+def _lookup(table: Dict[type, _ErrorSpec], exc: Exception) -> Optional[_ErrorSpec]:
+    """Return the spec of the nearest mapped class in the exception's MRO."""
+    for cls in type(exc).__mro__:
+        spec = table.get(cls)
+        if spec is not None:
+            return spec
+    return None
+
+
+@lru_cache(maxsize=1)
+def _openai_map() -> Dict[type, _ErrorSpec]:
+    """OpenAI error specs, built with the lazily imported exception classes."""
+    errors = _openai_errors()
+    return _build_map(
+        (
+            (
+                errors.RateLimitError,
+                (
+                    429,
+                    "rate_limit",
+                    "OpenAI rate limit reached. Please try again in a moment.",
+                ),
+            ),
+            (
+                errors.APITimeoutError,
+                (504, "timeout", "OpenAI timed out while generating the image."),
+            ),
+            (
+                errors.AuthenticationError,
+                (
+                    401,
+                    "auth_error",
+                    "Authentication with OpenAI failed. Check API key configuration.",
+                ),
+            ),
+            (
+                errors.BadRequestError,
+                (
+                    400,
+                    "bad_request",
+                    "Invalid request sent to OpenAI. Please verify your prompt or parameters.",
+                ),
+            ),
+            (
+                errors.APIConnectionError,
+                (
+                    503,
+                    "connection_error",
+                    "Could not connect to OpenAI. Please check network or OpenAI status.",
+                ),
+            ),
+            (
+                # Generic API error
+                errors.APIError,
+                (
+                    502,
+                    "api_error",
+                    "OpenAI encountered an internal error while generating the image.",
+                ),
+            ),
+        )
+    )
+
+
+@lru_cache(maxsize=1)
+def _gemini_map() -> Dict[type, _ErrorSpec]:
+    """Gemini error specs, built with the lazily imported exception classes."""
+    errors = _google_errors()
+    return _build_map(
+        (
+            (
+                errors.ResourceExhausted,
+                (
+                    429,
+                    "rate_limit",
+                    "Gemini usage limits reached. Please try again later.",
+                ),
+            ),
+            (
+                errors.DeadlineExceeded,
+                (504, "timeout", "Gemini timed out while generating the image."),
+            ),
+            (
+                errors.InvalidArgument,
+                (
+                    400,
+                    "bad_request",
+                    "Invalid request sent to Gemini. Please verify your prompt or parameters.",
+                ),
+            ),
+            (
+                errors.PermissionDenied,
+                (
+                    403,
+                    "permission_denied",
+                    "Access denied when calling Gemini. Check credentials or project permissions.",
+                ),
+            ),
+            (
+                errors.GoogleAPIError,
+                (
+                    502,
+                    "api_error",
+                    "Gemini encountered an internal error while generating the image.",
+                ),
+            ),
+        )
     )
-except Exception:
-    GoogleAPIError = DeadlineExceeded = ResourceExhausted = InvalidArgument = (
-        PermissionDenied
-    ) = Exception
 
 
 @dataclass
@@ -116,49 +271,19 @@ class MapExceptions:
         """Initialize the mapper without additional configuration."""
         pass
 
-    def map_openai_exception(self, exc: Exception) -> OpenAIImageError:
+    @staticmethod
+    def map_openai_exception(exc: Exception) -> OpenAIImageError:
         """
         Map low-level OpenAI exceptions to a clean domain error
         that the rest of your app (and FastAPI) understands.
         """
         logger.error("OpenAI error during image generation", exc_info=exc)
 
-        if isinstance(exc, RateLimitError):
-            return OpenAIImageError(
-                message="OpenAI rate limit reached. Please try again in a moment.",
-                status_code=429,
-                error_type="rate_limit",
-            )
-        if isinstance(exc, APITimeoutError):
-            return OpenAIImageError(
-                message="OpenAI timed out while generating the image.",
-                status_code=504,
-                error_type="timeout",
-            )
-        if isinstance(exc, AuthenticationError):
+        hit = _lookup(_openai_map(), exc)
+        if hit:
+            status_code, error_type, message = hit
             return OpenAIImageError(
-                message="Authentication with OpenAI failed. Check API key configuration.",
-                status_code=401,
-                error_type="auth_error",
-            )
-        if isinstance(exc, BadRequestError):
-            return OpenAIImageError(
-                message="Invalid request sent to OpenAI. Please verify your prompt or parameters.",
-                status_code=400,
-                error_type="bad_request",
-            )
-        if isinstance(exc, APIConnectionError):
-            return OpenAIImageError(
-                message="Could not connect to OpenAI. Please check network or OpenAI status.",
-                status_code=503,
-                error_type="connection_error",
-            )
-        if isinstance(exc, APIError):
-            # Generic API error
-            return OpenAIImageError(
-                message="OpenAI encountered an internal error while generating the image.",
-                status_code=502,
-                error_type="api_error",
+                message=message, status_code=status_code, error_type=error_type
             )
 
         # Fallback unknown error
@@ -169,41 +294,18 @@ class MapExceptions:
             details={"exception_type": exc.__class__.__name__},
         )
 
-    def map_gemini_exception(self, exc: Exception) -> GeminiImageError:
+    @staticmethod
+    def map_gemini_exception(exc: Exception) -> GeminiImageError:
         """
         Map low-level Gemini / Google exceptions to a clean domain error.
         """
         logger.error("Gemini error during image generation", exc_info=exc)
 
-        if isinstance(exc, ResourceExhausted):
-            return GeminiImageError(
-                message="Gemini usage limits reached. Please try again later.",
-                status_code=429,
-                error_type="rate_limit",
-            )
-        if isinstance(exc, DeadlineExceeded):
-            return GeminiImageError(
-                message="Gemini timed out while generating the image.",
-                status_code=504,
-                error_type="timeout",
-            )
-        if isinstance(exc, InvalidArgument):
-            return GeminiImageError(
-                message="Invalid request sent to Gemini. Please verify your prompt or parameters.",
-                status_code=400,
-                error_type="bad_request",
-            )
-        if isinstance(exc, PermissionDenied):
-            return GeminiImageError(
-                message="Access denied when calling Gemini. Check credentials or project permissions.",
-                status_code=403,
-                error_type="permission_denied",
-            )
-        if isinstance(exc, GoogleAPIError):
+        hit = _lookup(_gemini_map(), exc)
+        if hit:
+            status_code, error_type, message = hit
             return GeminiImageError(
-                message="Gemini encountered an internal error while generating the image.",
-                status_code=502,
-                error_type="api_error",
+                message=message, status_code=status_code, error_type=error_type
             )
 
         return GeminiImageError(
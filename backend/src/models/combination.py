@@ -0,0 +1,54 @@
+"""Pydantic schemas constraining the combiner LLM's structured output."""
+
+from functools import lru_cache
+from pydantic import BaseModel, Field, create_model
+from typing import Dict, List, Literal, Tuple, Type
+
+ATTRIBUTES = ("color_palette", "pattern", "motif", "style", "finish")
+
+
+class LLMCombination(BaseModel):
+    """One design combination as the LLM must emit it."""
+
+    color_palette: str
+    pattern: str
+    motif: str
+    style: str
+    finish: str
+    rationale: str = ""
+
+
+class LLMCombinations(BaseModel):
+    """Top-level combiner response: exactly three combinations."""
+
+    combinations: List[LLMCombination] = Field(min_length=3, max_length=3)
+
+
+@lru_cache(maxsize=8)
+def _catalog_schema(
+    frozen_catalog: Tuple[Tuple[str, Tuple[str, ...]], ...],
+) -> Type[BaseModel]:
+    """Build the catalog-constrained response model for a frozen catalog."""
+    values = dict(frozen_catalog)
+    fields = {
+        # Literal becomes a schema enum, so off-catalog values cannot be sampled.
+        key: (Literal[values[key]] if values.get(key) else str, ...)
+        for key in ATTRIBUTES
+    }
+    combination = create_model(
+        "LLMCatalogCombination", **fields, rationale=(str, "")
+    )
+    return create_model(
+        "LLMCatalogCombinations",
+        combinations=(List[combination], Field(min_length=3, max_length=3)),
+    )
+
+
+def catalog_schema(catalog: Dict[str, List[str]]) -> Type[BaseModel]:
+    """
+    Response model like LLMCombinations whose attribute fields only admit
+    the catalog's values. Cached per catalog contents.
+    """
+    return _catalog_schema(
+        tuple((key, tuple(catalog.get(key, ()))) for key in ATTRIBUTES)
+    )
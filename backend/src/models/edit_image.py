@@ -19,6 +19,7 @@ class EditRequest(BaseModel):
         "populate_by_name": True,
         "str_strip_whitespace": True,
         "extra": "ignore",
+        "frozen": True,
     }
 
     @field_validator("prompt")
@@ -34,3 +35,7 @@ class EditResponse(BaseModel):
 
     message: str = "Edit endpoint not yet implemented."
     variants: Dict[Literal["edited", "low", "medium", "high"], ImageItem]
+
+    model_config = {
+        "frozen": True,
+    }
@@ -3,15 +3,31 @@
 import io
 import base64
 from PIL import Image
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Any, Dict, List, Optional, Literal
 
+# Canonical spelling of the "let the model choose" selection value.
+DEFAULT_CHOICE = "Default"
+
+
+def normalize_choice(value: Any) -> Any:
+    """Trim a selection string and fold any casing of 'default' to DEFAULT_CHOICE."""
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    return DEFAULT_CHOICE if value.lower() == "default" else value
+
 
 class ImageItem(BaseModel):
     """Image blob encoded as base64 with MIME metadata."""
-    mime_type: str = "image/png"
+    mime_type: str = "image/webp"
     data_b64: str = ""
 
+    model_config = {
+        "extra": "ignore",
+        "frozen": True,
+    }
+
 
 class Combo(BaseModel):
     """Describes a single design combination and rationale used for generation."""
@@ -22,6 +38,10 @@ class Combo(BaseModel):
     finish: Optional[str] = None
     rationale: Optional[str] = None
 
+    model_config = {
+        "frozen": True,
+    }
+
 
 class GenerateRequest(BaseModel):
     """Payload describing the generation request and user selections."""
@@ -35,8 +55,14 @@ class GenerateRequest(BaseModel):
         "populate_by_name": True,
         "str_strip_whitespace": True,
         "extra": "ignore",
+        "frozen": True,
     }
 
+    @field_validator("selections")
+    def normalize_selections(cls, value: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize selection values once so downstream checks are plain lookups."""
+        return {k: normalize_choice(v) for k, v in value.items()}
+
 
 class ImageSet(BaseModel):
     """A collection of image variants and combo metadata for one design."""
@@ -44,6 +70,11 @@ class ImageSet(BaseModel):
     edited: bool = False
     variants: Dict[Literal["original", "low", "medium", "high", "edited"], ImageItem]
 
+    model_config = {
+        "extra": "ignore",
+        "frozen": True,
+    }
+
 
 class SidebarImage(BaseModel):
     """Lightweight representation for sidebar lists of generated images."""
@@ -54,6 +85,10 @@ class SidebarImage(BaseModel):
     variants: Dict[Literal["original", "low", "medium", "high", "edited"], ImageItem]
     combo: Combo = Field(default_factory=Combo)
 
+    model_config = {
+        "frozen": True,
+    }
+
 
 class RelatedRequest(BaseModel):
     """Request shape used to fetch related images for a generated item."""
@@ -62,6 +97,15 @@ class RelatedRequest(BaseModel):
     type: str
     selections: Dict[str, Any] = Field(default_factory=dict)
 
+    model_config = {
+        "frozen": True,
+    }
+
+    @field_validator("selections")
+    def normalize_selections(cls, value: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize selection values once so downstream checks are plain lookups."""
+        return {k: normalize_choice(v) for k, v in value.items()}
+
 
 class GenerateResponse(BaseModel):
     """Response envelope containing image sets and recent images."""
@@ -69,3 +113,12 @@ class GenerateResponse(BaseModel):
     message: str = "ok"
     image_sets: List[ImageSet] = Field(default_factory=list)
     recent_images: List[ImageItem] = Field(default_factory=list)
+
+    model_config = {
+        "extra": "ignore",
+        "frozen": True,
+    }
+
+
+# Resolve the nested response schema eagerly so no request pays for it.
+GenerateResponse.model_rebuild()
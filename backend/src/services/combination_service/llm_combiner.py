@@ -1,20 +1,173 @@
 """LLM-driven combination builder and Gemini client helpers."""
 
 from __future__ import annotations
-import json
+import orjson
 import random
+import asyncio
+import time
+import re
+import math
+import hashlib
+import itertools
+import threading
+import httpx
+import jsonschema_rs
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 import os
 from typing import Optional
 from google import genai
-from typing import Any, Callable, Dict, List, Optional
-from src.handlers.error_handler import MapExceptions
-from src.utility.utils import Helper
+from google.genai import types
+from google.genai.errors import APIError as GenaiAPIError, ClientError
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+from src.handlers.error_handler import ImageProviderError, MapExceptions
+from src.models.combination import ATTRIBUTES
+from src.utility.utils import Helper, compile_template, render_template
+from src.utility.cache import LRUCache
+from src.utility.http_client import HttpClients
 from src.utility.logger import AppLogger
 
 logger = AppLogger.get_logger(__name__)
 
 Json = Dict[str, Any]
 LLMFn = Callable[[str], str]  # (prompt) -> raw_text_response
+PrefixLLMFn = Callable[[str, str], str]  # (static_prefix, tail) -> raw_text_response
+# (prompts) -> raw text per prompt, None where that request failed
+BatchLLMFn = Callable[[List[str]], List[Optional[str]]]
+
+# Placeholder rationales attached to combinations the LLM did not write.
+DIVERSIFIED_RATIONALE = "Auto-diversified fallback."
+FALLBACK_RATIONALE = "balanced rotation across defaults."
+# Rationales shorter than this are treated as missing.
+RATIONALE_MIN_CHARS = 20
+
+
+def needs_rationale(combo: Json, min_chars: int = RATIONALE_MIN_CHARS) -> bool:
+    """True when a combination lacks a usable LLM-written rationale."""
+    rationale = (combo.get("rationale") or "").strip()
+    return (
+        len(rationale) < min_chars
+        or rationale in (DIVERSIFIED_RATIONALE, FALLBACK_RATIONALE)
+    )
+
+
+# Gemini service tiers: "priority" for calls the user is waiting on,
+# "flex" (cheaper, slower) for work nobody is blocked on.
+COMBINATION_SERVICE_TIER = "priority"
+BATCH_RATIONALE_SERVICE_TIER = "flex"
+
+
+@lru_cache(maxsize=32)
+def _combinations_validator(catalog_json: str, defaulted: Tuple[str, ...]):
+    """
+    Compiled JSON Schema validator for a combiner response. Only defaulted
+    attributes are constrained to catalog enums; locked ones are overwritten
+    with the user's selection afterwards. Cached per catalog and lock shape.
+    """
+    catalog = orjson.loads(catalog_json)
+    item = {
+        "type": "object",
+        "properties": {
+            k: {"type": "string", "enum": catalog.get(k, [])} for k in defaulted
+        },
+        "required": list(defaulted),
+    }
+    schema = {
+        "type": "object",
+        "properties": {
+            "combinations": {
+                "type": "array",
+                "items": item,
+                "minItems": 3,
+                "maxItems": 3,
+            }
+        },
+        "required": ["combinations"],
+    }
+    return jsonschema_rs.validator_for(schema)
+
+
+# Diversification fill: enumerate the defaulted-attribute space up to this
+# size, otherwise rejection-sample with a bounded number of tries.
+_ENUMERATE_LIMIT = 4096
+_MAX_SAMPLE_TRIES = 100
+
+# A whole response wrapped in a ``` or ```json fence; group 1 is the body.
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*\Z", re.DOTALL)
+
+
+# HTTP statuses worth retrying: rate limiting and gateway/availability errors.
+_TRANSIENT_STATUS = {429, 502, 503, 504}
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """
+    True for rate limits, timeouts and connection failures that a retry can
+    fix. Follows the exception chain, since gemini_call re-raises SDK errors
+    as mapped ImageProviderErrors.
+    """
+    while exc is not None:
+        if isinstance(exc, ImageProviderError):
+            if exc.status_code in _TRANSIENT_STATUS:
+                return True
+        elif isinstance(exc, GenaiAPIError):
+            if exc.code in _TRANSIENT_STATUS or exc.code == 500:
+                return True
+        elif isinstance(exc, (TimeoutError, httpx.TransportError)):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+# Up to 3 attempts with jittered exponential backoff (capped at 2s) for
+# transient LLM failures; anything else fails fast into the local fallback.
+_LLM_RETRY = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(multiplier=0.2, max=2),
+    retry=retry_if_exception(_is_transient),
+    reraise=True,
+)
+
+
+# Validated combinations per prompt digest (the prompt already encodes type,
+# selections and catalog), and rationale text per (type, model, combination).
+_COMBINATION_CACHE = LRUCache(maxsize=512)
+_RATIONALE_CACHE = LRUCache(maxsize=512)
+
+# The combination prompt splits here into a static prefix (catalog, rules,
+# schema) and the per-request tail (product type, user selections).
+PROMPT_SPLIT_MARKER = "## Request\n"
+# Gemini batch jobs: completion is only promised within 24h.
+BATCH_TIMEOUT_SECONDS = 24 * 3600
+_BATCH_OK_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"}
+_BATCH_TERMINAL_STATES = _BATCH_OK_STATES | {
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+# Lifetime of explicit Gemini context caches holding the static prefix.
+CONTEXT_CACHE_TTL_SECONDS = 3600
+# prefix digest -> (cache name or None if creation failed, expiry monotonic time)
+_CONTEXT_CACHES: Dict[str, tuple] = {}
+# Guards the two dicts; creates for one prefix serialize on that key's lock.
+_CONTEXT_CACHE_LOCK = threading.Lock()
+_CONTEXT_CACHE_KEY_LOCKS: Dict[str, threading.Lock] = {}
+
+
+# Identity of a combination: its attribute values, in ATTRIBUTES order.
+_attribute_values = itemgetter(*ATTRIBUTES)
+
+
+def _rationale_key(type: str, combination: Dict[str, Any], model: str) -> tuple:
+    """Cache key for a rationale: the five design attributes plus type/model."""
+    return (type, model, *_attribute_values(combination))
 
 
 class LLMCombiner:
@@ -23,12 +176,26 @@ class LLMCombiner:
     and returns three validated combinations. Falls back to a local generator if needed.
     """
 
-    def __init__(self, llm_fn: LLMFn):
+    def __init__(
+        self,
+        llm_fn: LLMFn,
+        prefix_llm_fn: Optional[PrefixLLMFn] = None,
+        batch_llm_fn: Optional[BatchLLMFn] = None,
+    ):
         """
         llm_fn: a callable taking a prompt string and returning raw text (LLM output).
                 Example for Gemini: lambda p: genai_model.generate_content(p).text
+        prefix_llm_fn: optional callable taking the prompt split into its static
+                prefix and per-request tail, so the prefix can be served from
+                a provider-side context cache. Preferred over llm_fn when given.
+        batch_llm_fn: optional callable answering a list of prompts in one
+                offline batch job; used by generate_batch(offline=True).
         """
         self.llm_fn = llm_fn
+        self.prefix_llm_fn = prefix_llm_fn
+        self.batch_llm_fn = batch_llm_fn
+        self._catalog_cache: Optional[tuple] = None
+        self._head_cache: Optional[tuple] = None
         self.utility = Helper()
 
     @staticmethod
@@ -41,94 +208,143 @@ class LLMCombiner:
         selections: dict like {"color_palette": "...", "pattern": "...", "motif": "...", "style": "...", "finish": "..."}
         catalog: dict like {"color_palette": [...], "pattern": [...], "motif": [...], "style": [...], "finish": [...]}
         """
-        prompt_template = self.utility.load_template(template="combination")
-        user_selections_json = json.dumps(selections, ensure_ascii=False, indent=2)
-        catalog_json = json.dumps(catalog, ensure_ascii=False, indent=2)
-        return prompt_template.format(
-            type=type,
-            user_selections_json=user_selections_json,
-            catalog_json=catalog_json,
+        template = self.utility.load_template(template="combination")
+        head, marker, tail = template.partition(PROMPT_SPLIT_MARKER)
+        # Canonical attribute order, so the same selections sent in any key
+        # order render the same prompt and share a cache entry.
+        ordered = {k: selections[k] for k in ATTRIBUTES if k in selections}
+        ordered.update(selections)
+        user_selections_json = orjson.dumps(
+            ordered, option=orjson.OPT_INDENT_2
+        ).decode()
+        values = {
+            "type": type,
+            "user_selections_json": user_selections_json,
+            "catalog_json": self._catalog_json(catalog),
+        }
+        if not marker:
+            return render_template(compile_template(template), values)
+        # Only the tail varies per request; the head is rendered once per catalog.
+        return self._static_head(head, catalog) + render_template(
+            compile_template(marker + tail), values
         )
 
-    def _validate_and_fix(self, data: Any, catalog: Json, lock: Json) -> List[Json]:
+    def _catalog_json(self, catalog: Json) -> str:
         """
-        Validate JSON from LLM; enforce schema and catalog membership.
-        lock: non-default selections that must be kept.
-        Returns a list of exactly 3 combinations. Raises on unrecoverable issues.
+        Serialize the catalog, reusing the last result for the same dict.
+        The catalog leads the template; sorting keeps that prefix byte-identical
+        across requests so Gemini's implicit prefix cache can hit. The cached
+        dict is kept referenced, so the identity check cannot alias.
         """
-        if not isinstance(data, dict) or "combinations" not in data:
-            raise ValueError("Missing 'combinations' key.")
+        cached = self._catalog_cache
+        if cached is not None and cached[0] is catalog:
+            return cached[1]
+        catalog_json = orjson.dumps(
+            catalog, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        ).decode()
+        self._catalog_cache = (catalog, catalog_json)
+        self._head_cache = None
+        return catalog_json
+
+    def _static_head(self, head_template: str, catalog: Json) -> str:
+        """Render the catalog-only head of the prompt, reusing the last result."""
+        catalog_json = self._catalog_json(catalog)
+        cached = self._head_cache
+        if cached is not None and cached[0] == head_template:
+            return cached[1]
+        head = render_template(
+            compile_template(head_template), {"catalog_json": catalog_json}
+        )
+        self._head_cache = (head_template, head)
+        return head
 
-        combos = data["combinations"]
-        if not isinstance(combos, list) or len(combos) != 3:
-            raise ValueError("Expected exactly 3 combinations.")
+    @staticmethod
+    def split_prompt(prompt: str) -> tuple:
+        """Split a built prompt into (static prefix, per-request tail)."""
+        idx = prompt.find(PROMPT_SPLIT_MARKER)
+        if idx == -1:
+            return "", prompt
+        return prompt[:idx], prompt[idx:]
+
+    _sig = staticmethod(_attribute_values)
+
+    def _fresh_candidates(
+        self, catalog: Json, lock: Json, seen: set, needed: int
+    ) -> List[Json]:
+        """
+        Pick up to `needed` random combinations whose signatures are not in
+        `seen`, varying only defaulted attributes. Small spaces are enumerated
+        and shuffled; large ones are rejection-sampled with a hard cap.
+        """
+        choices = {}
+        for k in ATTRIBUTES:
+            if not self._is_default(lock.get(k, "Default")):
+                choices[k] = [lock[k]]
+            elif catalog.get(k):
+                choices[k] = catalog[k]
+            else:
+                raise ValueError(f"No catalog values for '{k}'.")
+
+        picked: List[Json] = []
+        if math.prod(len(v) for v in choices.values()) <= _ENUMERATE_LIMIT:
+            pool = list(itertools.product(*(choices[k] for k in ATTRIBUTES)))
+            random.shuffle(pool)
+            for sig in pool:
+                if len(picked) == needed:
+                    break
+                if sig not in seen:
+                    seen.add(sig)
+                    picked.append(dict(zip(ATTRIBUTES, sig)))
+            return picked
+
+        for _ in range(_MAX_SAMPLE_TRIES):
+            if len(picked) == needed:
+                break
+            sig = tuple(random.choice(choices[k]) for k in ATTRIBUTES)
+            if sig not in seen:
+                seen.add(sig)
+                picked.append(dict(zip(ATTRIBUTES, sig)))
+        return picked
 
+    def _validate_and_fix(self, data: Json, catalog: Json, lock: Json) -> List[Json]:
+        """
+        Validate a parsed LLM payload against the catalog schema, then apply
+        locks. lock: non-default selections that must be kept.
+        Returns a list of exactly 3 combinations. Raises on unrecoverable issues,
+        including duplicates that cannot be replaced within the sampling cap.
+        """
+        defaulted = tuple(
+            k for k in ATTRIBUTES if self._is_default(lock.get(k, "Default"))
+        )
+        # Shape, types and catalog membership are checked in one compiled pass.
+        _combinations_validator(self._catalog_json(catalog), defaulted).validate(data)
         fixed: List[Json] = []
-        for idx, c in enumerate(combos):
-            if not isinstance(c, dict):
-                raise ValueError(f"Combination {idx} is not an object.")
-
-            out = {}
-            for k in ("color_palette", "pattern", "motif", "style", "finish"):
-                # enforce locked (non-default) attrs
-                if not self._is_default(lock.get(k, "Default")):
-                    out[k] = lock[k]
-                else:
-                    v = c.get(k)
-                    if not isinstance(v, str):
-                        raise ValueError(f"Combination {idx}: '{k}' must be a string.")
-                    if k not in catalog or v not in catalog[k]:
-                        raise ValueError(
-                            f"Combination {idx}: '{k}' value '{v}' not in catalog."
-                        )
-                    out[k] = v
-
+        for c in data["combinations"]:
+            out = {k: (c[k] if k in defaulted else lock[k]) for k in ATTRIBUTES}
             # rationale (optional but nice)
             rationale = c.get("rationale")
             out["rationale"] = rationale if isinstance(rationale, str) else ""
-
             fixed.append(out)
 
         # de-duplicate exact duplicates
         unique = []
         seen = set()
         for c in fixed:
-            sig = (
-                c["color_palette"],
-                c["pattern"],
-                c["motif"],
-                c["style"],
-                c["finish"],
-            )
+            sig = self._sig(c)
             if sig not in seen:
                 seen.add(sig)
                 unique.append(c)
 
-        # If LLM produced dupes, try to diversify by randomizing remaining catalog choices
-        while len(unique) < 3:
-            # choose alternatives only for defaulted attributes
-            candidate = {}
-            for k in ("color_palette", "pattern", "motif", "style", "finish"):
-                if not self._is_default(lock.get(k, "Default")):
-                    candidate[k] = lock[k]
-                else:
-                    cand_list = [x for x in catalog.get(k, [])]
-                    # avoid picking already used combos
-                    if cand_list:
-                        candidate[k] = random.choice(cand_list)
-                    else:
-                        raise ValueError(f"No catalog values for '{k}'.")
-            sig = (
-                candidate["color_palette"],
-                candidate["pattern"],
-                candidate["motif"],
-                candidate["style"],
-                candidate["finish"],
-            )
-            if sig not in seen:
-                candidate["rationale"] = "Auto-diversified fallback."
-                seen.add(sig)
+        # If LLM produced dupes, fill from unseen catalog choices
+        if len(unique) < 3:
+            needed = 3 - len(unique)
+            for candidate in self._fresh_candidates(catalog, lock, seen, needed):
+                candidate["rationale"] = DIVERSIFIED_RATIONALE
                 unique.append(candidate)
+            if len(unique) < 3:
+                raise ValueError(
+                    f"Only {len(unique)} distinct combinations after filling."
+                )
 
         return unique[:3]
 
@@ -139,63 +355,122 @@ class LLMCombiner:
         - Varies only default attributes.
         """
         lock = selections
-        # build 3 varied picks round-robin
-        picks: List[Json] = []
-        # prepare indices for default lists
+        # prepare value lists for default attributes
         def_lists: Dict[str, List[str]] = {
             k: (
                 catalog.get(k, [])
                 if self._is_default(lock.get(k, "Default"))
                 else [lock[k]]
             )
-            for k in ("color_palette", "pattern", "motif", "style", "finish")
+            for k in ATTRIBUTES
         }
-        for i in range(3):
-            combo = {}
-            for k, vals in def_lists.items():
-                if len(vals) == 0:
-                    raise ValueError(f"No options for '{k}'.")
-                combo[k] = vals[i % len(vals)]
-            combo["rationale"] = "balanced rotation across defaults."
-            picks.append(combo)
-        # ensure uniqueness
-        uniq, seen = [], set()
-        for c in picks:
-            sig = (
-                c["color_palette"],
-                c["pattern"],
-                c["motif"],
-                c["style"],
-                c["finish"],
+        for k, vals in def_lists.items():
+            if len(vals) == 0:
+                raise ValueError(f"No options for '{k}'.")
+        # Round-robin rows i and j only coincide when every list length divides
+        # j - i, so with a list of 3+ values all rows differ; otherwise the
+        # first max-length rows are exactly the distinct ones.
+        rows = min(3, max(len(vals) for vals in def_lists.values()))
+        columns = [
+            [vals[i % len(vals)] for i in range(rows)] for vals in def_lists.values()
+        ]
+        return [
+            dict(zip(def_lists, row), rationale=FALLBACK_RATIONALE)
+            for row in zip(*columns)
+        ]
+
+    @staticmethod
+    def _prompt_key(prompt: str) -> str:
+        """Cache key for a built combination prompt."""
+        return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _combos_from_raw(
+        self, raw: Optional[str], key: str, selections: Json, catalog: Json
+    ) -> List[Json]:
+        """
+        Decode, validate and cache an LLM response; local fallback on failure.
+        raw: the LLM's text, or None when the call itself failed.
+        """
+        try:
+            if not raw:
+                raise ValueError("No LLM response.")
+            # Some LLMs wrap JSON in code fences; unwrap only a full fence.
+            fenced = _FENCE_RE.match(raw)
+            data = orjson.loads(fenced.group(1) if fenced else raw)
+            combos = self._validate_and_fix(data, catalog, selections)
+            _COMBINATION_CACHE.put(key, [dict(c) for c in combos])
+            return combos
+        except Exception:
+            # Fallback if anything goes wrong
+            logger.warning(
+                "Combination Generation fails, falling back to local fallback"
             )
-            if sig not in seen:
-                seen.add(sig)
-                uniq.append(c)
-        return uniq[:3]
+            return self._local_fallback(selections, catalog)
+
+    @_LLM_RETRY
+    def _call_llm(self, prompt: str) -> str:
+        """Send the prompt to the LLM, retrying transient failures."""
+        if self.prefix_llm_fn is not None:
+            return self.prefix_llm_fn(*self.split_prompt(prompt))
+        return self.llm_fn(prompt)
 
     def generate(self, type: str, selections: Json, catalog: Json) -> List[Json]:
         """
-        Returns exactly 3 combinations.
+        Returns exactly 3 combinations, or fewer only when the local fallback
+        finds the catalog cannot supply 3 distinct ones.
         """
         prompt = self.build_prompt(type, selections, catalog)
+        key = self._prompt_key(prompt)
+        cached = _COMBINATION_CACHE.get(key)
+        if cached is not None:
+            logger.info("Using cached combinations")
+            return [dict(c) for c in cached]
 
         # Try LLM
         try:
-            raw = self.llm_fn(prompt)
-            # Some LLMs wrap JSON in code fences; strip them safely.
-            raw_str = raw.strip()
-            if raw_str.startswith("```"):
-                raw_str = raw_str.strip("`")
-                # remove leading 'json' if present after fence
-                if raw_str.startswith("json"):
-                    raw_str = raw_str[4:]
-            data = json.loads(raw_str)
-            combos = self._validate_and_fix(data, catalog, selections)
-            return combos
+            raw = self._call_llm(prompt)
         except Exception:
-            # Fallback if anything goes wrong
-            logger.warning(f"Combination Generation failes, falling to local fallback")
-            return self._local_fallback(selections, catalog)
+            raw = None
+        return self._combos_from_raw(raw, key, selections, catalog)
+
+    def generate_batch(
+        self,
+        type: str,
+        selections_list: List[Json],
+        catalog: Json,
+        offline: bool = False,
+    ) -> List[List[Json]]:
+        """
+        Combinations for many selection sets (catalog seeding, evaluation).
+        offline=True submits every uncached prompt as one discounted batch job
+        through batch_llm_fn; that can take hours, so it is opt-in and meant
+        for scripts, never request handlers. Otherwise each set goes through
+        generate(). Results keep the input order.
+        """
+        if not offline or self.batch_llm_fn is None:
+            return [self.generate(type, sel, catalog) for sel in selections_list]
+
+        prompts = [self.build_prompt(type, sel, catalog) for sel in selections_list]
+        keys = [self._prompt_key(p) for p in prompts]
+        results: List[Optional[List[Json]]] = []
+        pending: List[int] = []
+        for idx, key in enumerate(keys):
+            cached = _COMBINATION_CACHE.get(key)
+            results.append([dict(c) for c in cached] if cached is not None else None)
+            if cached is None:
+                pending.append(idx)
+
+        if pending:
+            try:
+                raws = self.batch_llm_fn([prompts[i] for i in pending])
+            except Exception as e:
+                logger.warning(f"Batch combination job failed: {e}")
+                raws = [None] * len(pending)
+            for idx, raw in zip(pending, raws):
+                results[idx] = self._combos_from_raw(
+                    raw, keys[idx], selections_list[idx], catalog
+                )
+        return results
 
 
 class GeminiClient:
@@ -206,9 +481,16 @@ class GeminiClient:
     Designed to be a lightweight dependency for combination generation.
     """
 
+    # (api_key, sync http client, async http client, genai.Client), shared
+    # by every GeminiClient so calls reuse one authenticated client.
+    _client_entry: Optional[tuple] = None
+    _client_lock = threading.Lock()
+    # Shared pool for sync callers fanning out blocking calls; network I/O
+    # releases the GIL, so N requests take roughly one round trip.
+    _EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gemini")
+
     def __init__(self):
-        """Initialize the Gemini helper with shared exception mappers."""
-        self.map_exception = MapExceptions()
+        """Initialize the Gemini helper and its shared utilities."""
         self.utility = Helper()
 
     def _get_api_key(
@@ -225,24 +507,187 @@ class GeminiClient:
         return key
 
     def make_gemini_client(self, api_key: Optional[str] = None):
-        """Create a configured Gemini client instance using the supplied API key."""
+        """
+        Return the process-wide Gemini client for the API key, creating it on
+        first use. Rebuilt only when the key changes or the shared HTTP
+        clients it wraps were closed and replaced.
+        """
         api_key = api_key or self._get_api_key()
-        # google.genai modern client
-        return genai.Client(api_key=api_key)
+        sync_http, async_http = HttpClients.get(), HttpClients.get_async()
+        with GeminiClient._client_lock:
+            cached = GeminiClient._client_entry
+            if (
+                cached is not None
+                and cached[0] == api_key
+                and cached[1] is sync_http
+                and cached[2] is async_http
+            ):
+                return cached[3]
+            # google.genai modern client
+            client = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(
+                    httpx_client=sync_http,
+                    httpx_async_client=async_http,
+                ),
+            )
+            GeminiClient._client_entry = (api_key, sync_http, async_http, client)
+            return client
+
+    @staticmethod
+    def _content_config(
+        service_tier: Optional[str] = None,
+        cached_content: Optional[str] = None,
+        response_schema: Any = None,
+    ) -> Optional[types.GenerateContentConfig]:
+        """
+        Build a request config for the service tier, context cache and/or
+        structured output. A response_schema makes Gemini emit JSON matching
+        it server-side, so no markdown or malformed output comes back.
+        """
+        if not service_tier and not cached_content and response_schema is None:
+            return None
+        return types.GenerateContentConfig(
+            service_tier=service_tier or None,
+            cached_content=cached_content,
+            response_mime_type="application/json" if response_schema else None,
+            response_schema=response_schema,
+        )
 
-    def gemini_call(self, prompt: str, model: str = "gemini-2.0-flash") -> str:
+    def _generate_content(
+        self,
+        client,
+        model: str,
+        contents: Any,
+        service_tier: Optional[str] = None,
+        cached_content: Optional[str] = None,
+        response_schema: Any = None,
+    ):
+        """
+        generate_content on the requested tier, retrying on the standard tier
+        when the model or account rejects the tier (HTTP 400).
+        """
+        config = self._content_config(service_tier, cached_content, response_schema)
+        try:
+            return client.models.generate_content(
+                model=model, contents=contents, config=config
+            )
+        except ClientError as e:
+            if not service_tier or e.code != 400:
+                raise
+            logger.warning(f"Service tier '{service_tier}' rejected, using standard")
+            return client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=self._content_config(
+                    cached_content=cached_content, response_schema=response_schema
+                ),
+            )
+
+    async def _agenerate_content(
+        self,
+        client,
+        model: str,
+        contents: Any,
+        service_tier: Optional[str] = None,
+        cached_content: Optional[str] = None,
+        response_schema: Any = None,
+    ):
+        """Async counterpart of _generate_content."""
+        config = self._content_config(service_tier, cached_content, response_schema)
+        try:
+            return await client.aio.models.generate_content(
+                model=model, contents=contents, config=config
+            )
+        except ClientError as e:
+            if not service_tier or e.code != 400:
+                raise
+            logger.warning(f"Service tier '{service_tier}' rejected, using standard")
+            return await client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=self._content_config(
+                    cached_content=cached_content, response_schema=response_schema
+                ),
+            )
+
+    def ensure_cache(self, client, prefix: str, model: str) -> Optional[str]:
+        """
+        Return the name of an explicit Gemini context cache holding `prefix`,
+        creating it on first use and again once the previous one expires.
+        Keyed on the prefix bytes, so a changed catalog gets a fresh cache.
+        Returns None when caching is unavailable (e.g. the prefix is below the
+        model's minimum cacheable size); that outcome is remembered for one
+        TTL so the create call is not retried on every request.
+        """
+        key = hashlib.blake2b(
+            f"{model}\0{prefix}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        with _CONTEXT_CACHE_LOCK:
+            entry = _CONTEXT_CACHES.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            key_lock = _CONTEXT_CACHE_KEY_LOCKS.setdefault(key, threading.Lock())
+        # Only requests for this prefix wait on the create below; the shared
+        # lock is not held across the network call.
+        with key_lock:
+            with _CONTEXT_CACHE_LOCK:
+                entry = _CONTEXT_CACHES.get(key)
+                now = time.monotonic()
+                if entry is not None and entry[1] > now:
+                    return entry[0]
+            try:
+                cache = client.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        contents=[prefix], ttl=f"{CONTEXT_CACHE_TTL_SECONDS}s"
+                    ),
+                )
+                name = cache.name
+                logger.info(f"Created Gemini context cache {name}")
+            except Exception as e:
+                logger.warning(f"Gemini context cache unavailable: {e}")
+                name = None
+            with _CONTEXT_CACHE_LOCK:
+                # Renew a minute early so a request never references an
+                # expired cache.
+                _CONTEXT_CACHES[key] = (name, now + CONTEXT_CACHE_TTL_SECONDS - 60)
+            return name
+
+    def gemini_call(
+        self,
+        prompt: str,
+        model: str = "gemini-2.0-flash",
+        service_tier: Optional[str] = None,
+        prefix: str = "",
+        response_schema: Any = None,
+    ) -> str:
         """
         Minimal wrapper: (prompt) -> text
         Compatible with current google.genai client methods.
+        When a static `prefix` is given it is served from an explicit context
+        cache and only `prompt` is sent; without a cache the two are joined.
+        A response_schema constrains the output to JSON of that shape.
         """
         client = self.make_gemini_client()
+        cached_content = self.ensure_cache(client, prefix, model) if prefix else None
+        contents = prompt if cached_content or not prefix else prefix + prompt
 
         # Try the current/primary method signature first
         try:
-            resp = client.models.generate_content(model=model, contents=prompt)
+            resp = self._generate_content(
+                client, model, contents, service_tier, cached_content, response_schema
+            )
         except Exception as e:
             logger.error(f"Error in Gemini Wrapper : {e}")
-            raise self.map_exception.map_gemini_exception(e)
+            raise MapExceptions.map_gemini_exception(e)
+
+        usage = getattr(resp, "usage_metadata", None)
+        if usage is not None:
+            logger.debug(
+                f"Gemini prompt tokens: {usage.prompt_token_count}, "
+                f"cached: {usage.cached_content_token_count}"
+            )
 
         # Extract text robustly
         if getattr(resp, "text", None):
@@ -262,37 +707,212 @@ class GeminiClient:
         # Last resort
         return str(resp)
 
+    def gemini_call_with_prefix(
+        self,
+        prefix: str,
+        prompt: str,
+        model: str = "gemini-2.0-flash",
+        service_tier: Optional[str] = None,
+        response_schema: Any = None,
+    ) -> str:
+        """(static prefix, tail) -> text, for LLMCombiner's prefix_llm_fn."""
+        return self.gemini_call(
+            prompt,
+            model=model,
+            service_tier=service_tier,
+            prefix=prefix,
+            response_schema=response_schema,
+        )
+
+    def gemini_batch_call(
+        self,
+        prompts: List[str],
+        model: str = "gemini-2.0-flash",
+        poll_interval: float = 30.0,
+        timeout: float = BATCH_TIMEOUT_SECONDS,
+        response_schema: Any = None,
+    ) -> List[Optional[str]]:
+        """
+        Answer many prompts with one Gemini batch job (half price, higher
+        rate limits, completion within 24h). Blocks while polling, so call it
+        from offline scripts only. Returns text per prompt, None on failure.
+        """
+        client = self.make_gemini_client()
+        try:
+            job = client.batches.create(
+                model=model,
+                src=[
+                    types.InlinedRequest(
+                        contents=[
+                            types.Content(role="user", parts=[types.Part(text=p)])
+                        ],
+                        config=self._content_config(response_schema=response_schema),
+                    )
+                    for p in prompts
+                ],
+            )
+            logger.info(f"Submitted Gemini batch job {job.name}")
+            deadline = time.monotonic() + timeout
+            while job.state.name not in _BATCH_TERMINAL_STATES:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Batch job {job.name} did not finish in time")
+                time.sleep(poll_interval)
+                job = client.batches.get(name=job.name)
+        except Exception as e:
+            logger.error(f"Gemini batch job failed: {e}")
+            raise MapExceptions.map_gemini_exception(e)
+
+        if job.state.name not in _BATCH_OK_STATES:
+            logger.error(f"Gemini batch job {job.name} ended in {job.state.name}")
+            return [None] * len(prompts)
+
+        texts: List[Optional[str]] = []
+        responses = (job.dest.inlined_responses if job.dest else None) or []
+        for item in responses:
+            text = getattr(item.response, "text", None) if item.response else None
+            texts.append(text or None)
+        return texts + [None] * (len(prompts) - len(texts))
+
     def generate_rationale(
-        self, type: str, combination: Dict[str, Any], model: str = "gemini-2.0-flash"
+        self,
+        type: str,
+        combination: Dict[str, Any],
+        model: str = "gemini-2.0-flash",
+        service_tier: Optional[str] = None,
     ) -> str:
         """Generate a concise rationale for a given design combination."""
+        key = _rationale_key(type, combination, model)
+        cached = _RATIONALE_CACHE.get(key)
+        if cached is not None:
+            return cached
         client = self.make_gemini_client()
         try:
             logger.info(f"Generating rationale for the selected combination")
-            rationale_prompt_template = self.utility.load_template(template="rationale")
-            prompt = rationale_prompt_template.format(
-                type=type,
-                color_palette=combination["color_palette"],
-                pattern=combination["pattern"],
-                motif=combination["motif"],
-                style=combination["style"],
-                finish=combination["finish"],
+            prompt = self._rationale_prompt(type, combination)
+            resp = self._generate_content(client, model, prompt, service_tier)
+            return self._remember_rationale(key, self._rationale_text(resp))
+        except Exception as e:
+            logger.error(f"Rationale generation failed: {e}")
+            raise MapExceptions.map_gemini_exception(e)
+
+    async def agenerate_rationale(
+        self,
+        type: str,
+        combination: Dict[str, Any],
+        model: str = "gemini-2.0-flash",
+        service_tier: Optional[str] = None,
+    ) -> str:
+        """Async variant of generate_rationale using the client's aio surface."""
+        key = _rationale_key(type, combination, model)
+        cached = _RATIONALE_CACHE.get(key)
+        if cached is not None:
+            return cached
+        client = self.make_gemini_client()
+        try:
+            logger.info(f"Generating rationale for the selected combination")
+            prompt = self._rationale_prompt(type, combination)
+            resp = await self._agenerate_content(client, model, prompt, service_tier)
+            return self._remember_rationale(key, self._rationale_text(resp))
+        except Exception as e:
+            logger.error(f"Rationale generation failed: {e}")
+            raise MapExceptions.map_gemini_exception(e)
+
+    async def astream_rationale(
+        self,
+        type: str,
+        combination: Dict[str, Any],
+        model: str = "gemini-2.0-flash",
+    ) -> AsyncIterator[str]:
+        """Yield rationale text chunks as Gemini produces them."""
+        key = _rationale_key(type, combination, model)
+        cached = _RATIONALE_CACHE.get(key)
+        if cached is not None:
+            yield cached
+            return
+        client = self.make_gemini_client()
+        chunks: List[str] = []
+        try:
+            logger.info(f"Streaming rationale for the selected combination")
+            prompt = self._rationale_prompt(type, combination)
+            stream = await client.aio.models.generate_content_stream(
+                model=model, contents=prompt
             )
-            resp = client.models.generate_content(model=model, contents=prompt)
-            if hasattr(resp, "text") and resp.text:
-                return resp.text.strip()
+            async for chunk in stream:
+                text = getattr(chunk, "text", None)
+                if text:
+                    chunks.append(text)
+                    yield text
+        except Exception as e:
+            logger.error(f"Rationale generation failed: {e}")
+            raise MapExceptions.map_gemini_exception(e)
+        self._remember_rationale(key, "".join(chunks).strip())
 
-            # Fallback: try candidates[0].content.parts text
-            try:
-                parts = resp.candidates[0].content.parts
-                texts = [p.text for p in parts if hasattr(p, "text")]
-                if texts:
-                    return " ".join(texts).strip()
-            except Exception as e:
-                logger.error(f"Rationale generation failed: {e}")
-                raise self.map_exception.map_gemini_exception(e)
+    async def generate_rationales(
+        self,
+        type: str,
+        combinations: List[Dict[str, Any]],
+        model: str = "gemini-2.0-flash",
+        service_tier: Optional[str] = BATCH_RATIONALE_SERVICE_TIER,
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate rationales for several combinations concurrently.
+        Results keep the input order; a failed call yields its exception
+        in place so one bad combination does not sink the others.
+        """
+        return await asyncio.gather(
+            *(
+                self.agenerate_rationale(type, c, model, service_tier)
+                for c in combinations
+            ),
+            return_exceptions=True,
+        )
+
+    def generate_rationales_parallel(
+        self,
+        type: str,
+        combinations: List[Dict[str, Any]],
+        model: str = "gemini-2.0-flash",
+        service_tier: Optional[str] = BATCH_RATIONALE_SERVICE_TIER,
+    ) -> List[str]:
+        """
+        Sync counterpart of generate_rationales for callers without an event
+        loop. Runs on the shared thread pool; results keep the input order
+        and the first failure is raised.
+        """
+        return list(
+            GeminiClient._EXECUTOR.map(
+                lambda c: self.generate_rationale(type, c, model, service_tier),
+                combinations,
+            )
+        )
+
+    @staticmethod
+    def _remember_rationale(key: tuple, text: str) -> str:
+        """Cache a successfully generated rationale and return it."""
+        if text and text != "Could not generate":
+            _RATIONALE_CACHE.put(key, text)
+        return text
+
+    def _rationale_prompt(self, type: str, combination: Dict[str, Any]) -> str:
+        """Fill the rationale template for a single combination."""
+        rationale_prompt_template = compile_template(
+            self.utility.load_template(template="rationale")
+        )
+        return render_template(rationale_prompt_template, {**combination, "type": type})
+
+    def _rationale_text(self, resp: Any) -> str:
+        """Extract rationale text from a Gemini response."""
+        if hasattr(resp, "text") and resp.text:
+            return resp.text.strip()
 
-            return "Could not generate"
+        # Fallback: try candidates[0].content.parts text
+        try:
+            parts = resp.candidates[0].content.parts
+            texts = [p.text for p in parts if hasattr(p, "text")]
+            if texts:
+                return " ".join(texts).strip()
         except Exception as e:
             logger.error(f"Rationale generation failed: {e}")
-            raise self.map_exception.map_gemini_exception(e)
+            raise MapExceptions.map_gemini_exception(e)
+
+        return "Could not generate"
@@ -1,8 +1,15 @@
 """Construct design combinations using configured options and LLM combiner."""
 
-from typing import Any, Dict, List
+from functools import partial
+from typing import Any, Dict, List, Optional
 from src.config.options import Options
-from src.services.combination_service.llm_combiner import LLMCombiner, GeminiClient
+from src.models.generate import DEFAULT_CHOICE
+from src.models.combination import catalog_schema
+from src.services.combination_service.llm_combiner import (
+    COMBINATION_SERVICE_TIER,
+    GeminiClient,
+    LLMCombiner,
+)
 from src.utility.logger import AppLogger
 
 logger = AppLogger.get_logger(__name__)
@@ -19,25 +26,52 @@ class Combinations:
     Intended to be reused by generation services.
     """
 
-    def __init__(self):
+    def __init__(self, gemini_client: Optional[GeminiClient] = None):
         """Initialize option catalogs, LLM combiner, and Gemini helper."""
         self.options = Options()
-        self.gemini_client = GeminiClient()
-        self.combiner = LLMCombiner(llm_fn=self.gemini_client.gemini_call)
-
-    def any_default(self, d: dict) -> bool:
-        """Return True when any selection value is flagged as default."""
-        return any(isinstance(v, str) and v.lower() == "default" for v in d.values())
-
-    def create_combinations(self, type: str, selections: Dict[str, Any]) -> List[Json]:
-        """Generate three combinations based on selections and available catalogs."""
-        catalog = {
+        self.gemini_client = gemini_client or GeminiClient()
+        # Options are static, so build the catalog once; the combiner reuses
+        # its serialized form for as long as this same dict is passed in.
+        self.catalog = {
             "color_palette": list(self.options.color_palettes),
             "pattern": list(self.options.patterns),
             "motif": list(self.options.motifs),
             "style": list(self.options.themes),
             "finish": list(self.options.finishes),
         }
-        combos = self.combiner.generate(type, selections, catalog)
+        # Combinations gate image generation, so they go on the priority tier,
+        # and are schema-constrained to valid JSON drawing only catalog values.
+        response_schema = catalog_schema(self.catalog)
+        self.combiner = LLMCombiner(
+            llm_fn=partial(
+                self.gemini_client.gemini_call,
+                service_tier=COMBINATION_SERVICE_TIER,
+                response_schema=response_schema,
+            ),
+            prefix_llm_fn=partial(
+                self.gemini_client.gemini_call_with_prefix,
+                service_tier=COMBINATION_SERVICE_TIER,
+                response_schema=response_schema,
+            ),
+            batch_llm_fn=partial(
+                self.gemini_client.gemini_batch_call, response_schema=response_schema
+            ),
+        )
+
+    def any_default(self, d: dict) -> bool:
+        """Return True when any selection value is flagged as default."""
+        return DEFAULT_CHOICE in d.values()
+
+    def create_combinations(self, type: str, selections: Dict[str, Any]) -> List[Json]:
+        """Generate three combinations based on selections and available catalogs."""
+        combos = self.combiner.generate(type, selections, self.catalog)
         logger.info(f"Generated {len(combos)} combinations")
         return combos
+
+    def create_combinations_batch(
+        self, type: str, selections_list: List[Dict[str, Any]], offline: bool = False
+    ) -> List[List[Json]]:
+        """Generate combinations for many selection sets, optionally batched."""
+        return self.combiner.generate_batch(
+            type, selections_list, self.catalog, offline=offline
+        )
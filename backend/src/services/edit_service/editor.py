@@ -5,17 +5,18 @@ import io
 import requests
 from PIL import Image
 from io import BytesIO
-from google import genai
 from dotenv import load_dotenv
 from google.genai import types
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from src.utility.utils import Helper
+from src.utility.utils import Helper, ATTR_KEYS, TRANSPORT_FORMAT
 from src.services.image_generation_service.model import Imagine
 from src.models.edit_image import EditRequest, EditResponse
 from src.services.post_service.post_processing import PostProcessing
 from src.handlers.error_handler import MapExceptions
+from src.services.combination_service.llm_combiner import GeminiClient
 from src.utility.path_finder import Finder
+from src.utility.http_client import HttpClients
 from src.utility.logger import AppLogger
 
 path_finder = Finder()
@@ -23,6 +24,9 @@ env_path = path_finder.get_directory("root") / ".env"
 load_dotenv(env_path)
 logger = AppLogger.get_logger(__name__)
 
+# Input formats Gemini accepts as-is, so stored files need no re-encode.
+GEMINI_IMAGE_TYPES = frozenset({"image/png", "image/jpeg", "image/webp"})
+
 
 class Editor:
     """Orchestrates AI editing workflows with Gemini, OpenAI, or mock pipelines.
@@ -37,12 +41,23 @@ class Editor:
         """Initialize dependencies for editing operations and utilities."""
         self.model = Imagine()
         self.post_processing = PostProcessing()
-        self.exception = MapExceptions()
         self.path_finder = Finder()
         self.utility = Helper()
-
-    def edit_with_gemini(self, base_img: Image.Image, prompt: str) -> Dict[str, Any]:
-        """Send an edit request to Gemini and return generated variants."""
+        self.gemini = GeminiClient()
+
+    def edit_with_gemini(
+        self,
+        base_img: Image.Image,
+        prompt: str,
+        raw_bytes: Optional[bytes] = None,
+        mime_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Send an edit request to Gemini and return generated variants.
+        raw_bytes/mime_type: the image's stored encoding when already at hand
+        (e.g. read from disk); base_img is only re-encoded to PNG when that
+        format is not one Gemini accepts.
+        """
         try:
             api_key = os.getenv("GEMINI_API_KEY")
             if not api_key:
@@ -53,10 +68,14 @@ class Editor:
                 }
             else:
                 status = False
-                client = genai.Client(api_key=api_key)
+                client = self.gemini.make_gemini_client(api_key)
 
                 # Build request: text + image
-                img_bytes = self.model.pil_to_png_bytes(base_img)
+                if raw_bytes and mime_type in GEMINI_IMAGE_TYPES:
+                    img_bytes = raw_bytes
+                else:
+                    img_bytes = self.model.pil_to_png_bytes(base_img)
+                    mime_type = "image/png"
                 # parts = [
                 #     types.Part.from_bytes(
                 #         data=img_bytes,
@@ -72,7 +91,7 @@ class Editor:
                     contents=[
                         prompt,
                         types.Part.from_bytes(
-                            data=img_bytes, mime_type="image/png"
+                            data=img_bytes, mime_type=mime_type
                         ),  # or use this helper
                     ],
                 )
@@ -89,7 +108,7 @@ class Editor:
                 if not edited_bytes:
                     return {"status": False, "msg": "Edit response missing image data."}
                 else:
-                    edited_img = Image.open(BytesIO(edited_bytes)).convert("RGBA")
+                    edited_img = Image.open(BytesIO(edited_bytes)).convert("RGB")
 
                     # Update originals + rebuild your enhanced variants
                     status = True
@@ -115,10 +134,14 @@ class Editor:
                 "msg": f"Image edit failed: {e.response.text if e.response is not None else e}",
             }
         except Exception as e:
-            raise self.exception.map_gemini_exception(e)
+            raise MapExceptions.map_gemini_exception(e)
 
     def edit_with_openai(
-        self, base_img: Image.Image, edit_prompt: str
+        self,
+        base_img: Image.Image,
+        edit_prompt: str,
+        raw_bytes: Optional[bytes] = None,
+        mime_type: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Submit an edit job to OpenAI edits endpoint and parse the response image."""
         try:
@@ -132,12 +155,14 @@ class Editor:
                 }
             else:
                 size = self.model.pick_openai_size_from_image(base_img)
+                # The edits endpoint takes an RGBA PNG; reuse stored bytes
+                # only when they already are one.
+                if raw_bytes and mime_type == "image/png" and base_img.mode == "RGBA":
+                    img_bytes = raw_bytes
+                else:
+                    img_bytes = self.model.pil_to_png_bytes(base_img)
                 files = {
-                    "image": (
-                        "image.png",
-                        self.model.pil_to_png_bytes(base_img),
-                        "image/png",
-                    ),
+                    "image": ("image.png", img_bytes, "image/png"),
                 }
                 data = {
                     "model": "dall-e-2",  # supports edits/inpainting
@@ -145,7 +170,7 @@ class Editor:
                     "size": size,
                 }
                 logger.info("Sending edit request to OpenAI...")
-                resp = requests.post(
+                resp = HttpClients.get_session().post(
                     edit_url,
                     headers={"Authorization": f"Bearer {api_key}"},
                     data=data,
@@ -171,9 +196,9 @@ class Editor:
                     elif out.get("url"):
                         # fallback: download from signed URL
                         logger.info("Fetching edited image from URL...")
-                        r = requests.get(out["url"], timeout=30)
+                        r = HttpClients.get_session().get(out["url"], timeout=30)
                         r.raise_for_status()
-                        eimg = Image.open(io.BytesIO(r.content)).convert("RGBA")
+                        eimg = Image.open(io.BytesIO(r.content)).convert("RGB")
                     if eimg is None:
                         return {
                             "status": False,
@@ -191,7 +216,7 @@ class Editor:
                 "msg": f"Image edit failed: {e.response.text if e.response is not None else e}",
             }
         except Exception as e:
-            raise self.exception.map_openai_exception(e)
+            raise MapExceptions.map_openai_exception(e)
 
     def edit_with_mock_image(
         self, base_img: Image.Image, prompt: str
@@ -242,24 +267,21 @@ class Edit:
         self.editor = Editor()
         self.model = Imagine()
         self.utility = Helper()
-        self.attr_keys = ("color_palette", "pattern", "motif", "style", "finish")
 
-    def edit_image(self, context: EditRequest, model: str = "gemini") -> EditResponse:
+    def edit_image(
+        self,
+        context: EditRequest,
+        model: str = "gemini",
+        fmt: str = TRANSPORT_FORMAT,
+    ) -> EditResponse:
         """Edits an image based on the provided request and selected model"""
         output_dir, _ = self.model._get_output_dir_and_metadata()
 
         if not output_dir.exists():
             return
-        for fname in self.model._iter_image_filenames(output_dir):
-            parsed = self.model._parse_image_filename(fname)
-            if not parsed:
-                continue
-
-            file_theme_slug, stamp, short_spec = parsed
-
-            if str(stamp) == context.id:
-                target_fname = fname
-                break
+        stamp = context.id
+        names = self.model._filenames_for_id(output_dir, stamp)
+        target_fname = names[0] if names else None
 
         if not target_fname:
             return EditResponse(
@@ -268,14 +290,22 @@ class Edit:
             )
 
         base_path = output_dir / target_fname
-        base_img = Image.open(base_path).convert("RGBA")
+        raw = base_path.read_bytes()
+        # Decoded lazily: the editors send the stored bytes as-is when the
+        # provider accepts their format, and re-encode to PNG otherwise.
+        base_img = Image.open(BytesIO(raw))
+        mime_type = Image.MIME.get(base_img.format)
 
         if model == "mock":
             result = self.editor.edit_with_mock_image(base_img, context.prompt)
         elif model == "openai":
-            result = self.editor.edit_with_openai(base_img, context.prompt)
+            result = self.editor.edit_with_openai(
+                base_img, context.prompt, raw_bytes=raw, mime_type=mime_type
+            )
         else:
-            result = self.editor.edit_with_gemini(base_img, context.prompt)
+            result = self.editor.edit_with_gemini(
+                base_img, context.prompt, raw_bytes=raw, mime_type=mime_type
+            )
 
         if not result.get("status"):
             return EditResponse(
@@ -283,14 +313,17 @@ class Edit:
                 edited=None,
             )
         images = result["images"]
-        edited = self.utility.from_pil(images.get("org", ""))
-        low = self.utility.from_pil(images.get("low", ""))
-        med = self.utility.from_pil(images.get("medium", ""))
-        high = self.utility.from_pil(images.get("high", ""))
-
-        spec_parts = [
-            getattr(context.combo, key) for key in self.attr_keys if key != "rationale"
-        ]
+        edited, low, med, high = self.utility.from_pil_many(
+            [
+                images.get("org", ""),
+                images.get("low", ""),
+                images.get("medium", ""),
+                images.get("high", ""),
+            ],
+            fmt,
+        )
+
+        spec_parts = [getattr(context.combo, key) for key in ATTR_KEYS]
         short_spec = self.utility._slug("-".join(spec_parts))[:60]
         theme_slug = self.utility._slug(context.theme)
         file_name = f"{theme_slug}_{stamp}_{short_spec}_edited.png"
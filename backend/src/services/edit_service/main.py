@@ -1,5 +1,6 @@
 """Service factory for obtaining editing service instances."""
 
+from functools import lru_cache
 from src.services.edit_service.editor import Edit
 from src.models.edit_image import EditResponse
 
@@ -11,6 +12,7 @@ class ImageImpainting:
     Allows swapping the underlying editor implementation if needed.
     """
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_editor() -> EditResponse:
-        """Provide a configured editor for request handlers."""
+        """Provide the process-wide editor for request handlers."""
         return Edit()
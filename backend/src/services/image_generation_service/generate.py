@@ -2,19 +2,17 @@
 
 import os
 import io
-import json
+import orjson
 import time
 import asyncio
-import requests
-import traceback
+import threading
 from PIL import Image
 from io import BytesIO
-from google import genai
-from openai import OpenAI
 from socket import gaierror
 from termcolor import colored
-from datetime import datetime
-from typing import AsyncIterator, Dict, List, Tuple, Any
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import AsyncIterator, Dict, List, Tuple, Any, Union
 
 from src.models.generate import (
     GenerateResponse,
@@ -23,17 +21,44 @@ from src.models.generate import (
     ImageSet,
     Combo,
 )
-from src.utility.utils import Helper
+from src.utility.utils import Helper, ATTR_KEYS, TRANSPORT_FORMAT
 from src.utility.path_finder import Finder
+from src.utility.http_client import HttpClients
 from src.handlers.error_handler import MapExceptions
 from src.services.image_generation_service.model import Imagine
 from src.services.post_service.post_processing import PostProcessing
-from src.services.combination_service.llm_combiner import GeminiClient
+from src.services.combination_service.llm_combiner import (
+    GeminiClient,
+    needs_rationale,
+)
 from src.services.combination_service.make_combinations import Combinations
 from src.utility.logger import AppLogger
 
 logger = AppLogger.get_logger(__name__)
 
+_ATTR_GETTER = itemgetter(*ATTR_KEYS)
+_SPEC_DEFAULTS = dict.fromkeys(ATTR_KEYS, "default")
+# Upper bound on concurrent image generations per streamed request.
+_GENERATION_CONCURRENCY = 3
+
+_STAMP_LOCK = threading.Lock()
+_last_stamp: datetime | None = None
+
+
+def _next_stamp() -> str:
+    """
+    Return a unique second-resolution stamp for a new image.
+    Stamps double as image ids, so images saved within the same second
+    are pushed forward to the next free second instead of colliding.
+    """
+    global _last_stamp
+    with _STAMP_LOCK:
+        now = datetime.now().replace(microsecond=0)
+        if _last_stamp is not None and now <= _last_stamp:
+            now = _last_stamp + timedelta(seconds=1)
+        _last_stamp = now
+        return now.strftime("%Y%m%d_%H%M%S")
+
 
 class Generate:
     """Low-level image generation helpers using OpenAI, Gemini, or local mocks.
@@ -48,12 +73,15 @@ class Generate:
         """Set up paths, post-processing, and exception mappers."""
         self.path = Finder()
         self.post_processing = PostProcessing()
-        self.exceptions = MapExceptions()
+        self.gemini = GeminiClient()
 
     def generate_with_openai(
         self, final_prompt: str, model_name: str = "dall-e-3"
     ) -> Tuple[Image.Image, Dict[str, Image.Image]]:
         """Call OpenAI images API to generate variants for the provided prompt."""
+        # imported here: the openai SDK is slow to load and this path is optional
+        from openai import OpenAI
+
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             return {
@@ -61,7 +89,11 @@ class Generate:
                 "type": "Key Error",
                 "msg": "OPENAI_API_KEY is not set.",
             }
-        client = OpenAI(api_key=api_key) if api_key else None
+        client = (
+            OpenAI(api_key=api_key, http_client=HttpClients.get())
+            if api_key
+            else None
+        )
         gen_kwargs = {
             "model": model_name,
             "prompt": final_prompt,
@@ -79,9 +111,10 @@ class Generate:
                     elif getattr(item, "url", None):
                         try:
                             logger.info("Fetching image from URL")
-                            resp = requests.get(item.url, timeout=10)
+                            session = HttpClients.get_session()
+                            resp = session.get(item.url, timeout=10)
                             resp.raise_for_status()
-                            img = Image.open(io.BytesIO(resp.content)).convert("RGBA")
+                            img = Image.open(io.BytesIO(resp.content)).convert("RGB")
                         except Exception as e:
                             logger.warning(f"Could not fetch image from URL: {e}")
                             return None, None
@@ -102,7 +135,7 @@ class Generate:
             }
         except Exception as e:
             logger.error(f"Error Occurred while generating:{e}")
-            raise self.exceptions.map_openai_exception(e)
+            raise MapExceptions.map_openai_exception(e)
 
     def generate_with_gemini(
         self,
@@ -113,7 +146,7 @@ class Generate:
         if not gemini_api_key:
             logger.error("GEMINI API Key not Found")
             return None, None
-        client_gemini = genai.Client(api_key=gemini_api_key)
+        client_gemini = self.gemini.make_gemini_client(gemini_api_key)
         """
         Calls the image model and returns a tuple of (original_image, enhanced_variants).
         enhanced_variants is a dict with keys low/medium/high or None on failure.
@@ -134,14 +167,14 @@ class Generate:
                 for part in parts:
                     if part.inline_data is None:
                         continue
-                    img = Image.open(BytesIO(part.inline_data.data)).convert("RGBA")
+                    img = Image.open(BytesIO(part.inline_data.data)).convert("RGB")
                     low, medium, high = self.post_processing.apply_post_processing(img)
                     return img, {"low": low, "medium": medium, "high": high}
             return None, None
 
         except Exception as e:
             logger.error(f"Could not generate image: {e}")
-            raise self.exceptions.map_gemini_exception(e)
+            raise MapExceptions.map_gemini_exception(e)
 
     def generate_mock_image(
         self, index: int, folder: str = "demo", count: int = 3
@@ -151,20 +184,21 @@ class Generate:
         """
         logger.info(f"generating mock for image {index}")
         folder_path = self.path.get_directory("data") / folder
-        image_files = sorted(
-            [
-                f
-                for f in os.listdir(folder_path)
-                if f.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))
-            ],
-            key=lambda x: os.path.getmtime(os.path.join(folder_path, x)),
-            reverse=True,
-        )[:count]
+        # scandir's DirEntry caches stat, so no extra syscall per file
+        with os.scandir(folder_path) as it:
+            entries = [
+                (e.stat().st_mtime, e.name)
+                for e in it
+                if e.is_file()
+                and e.name.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))
+            ]
+        entries.sort(key=itemgetter(0), reverse=True)
+        image_files = [name for _, name in entries[:count]]
         index = index - 1
         if not image_files:
             return None, None
         img_path = os.path.join(folder_path, image_files[index])
-        img = Image.open(img_path).convert("RGBA")
+        img = Image.open(img_path).convert("RGB")
         if img is not None:
             low, medium, high = self.post_processing.apply_post_processing(img)
             return img, {"low": low, "medium": medium, "high": high}
@@ -181,13 +215,12 @@ class Generation:
 
     def __init__(self):
         """Initialize generation dependencies and reusable helpers."""
-        self.attr_keys = ("color_palette", "pattern", "motif", "style", "finish")
         self.generate = Generate()
         self.utility = Helper()
         self.imagine = Imagine()
         self.path = Finder()
-        self.combinations = Combinations()
         self.gemini_client = GeminiClient()
+        self.combinations = Combinations(gemini_client=self.gemini_client)
         self.run_mode = os.getenv("RUN_MODE", "actual")
 
     def _pre_loading(self, combo: dict, context: GenerateRequest) -> str:
@@ -224,25 +257,39 @@ class Generation:
             return rationale
         return self.gemini_client.generate_rationale(type, user_combo)
 
-    def _post_loading(
+    async def astream_rationale(
+        self, type: str, user_combo: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """Streaming counterpart of resolve_ratonale: yields rationale chunks."""
+        if self.run_mode == "mock":
+            yield self.imagine.get_mock_ingredients(type="rationale")
+            return
+        async for chunk in self.gemini_client.astream_rationale(type, user_combo):
+            yield chunk
+
+    async def _fill_rationales(self, type: str, combos: List[Dict[str, Any]]) -> None:
+        """Generate rationales for the given combos concurrently, in place."""
+        results = await self.gemini_client.generate_rationales(
+            type, combos, service_tier=None
+        )
+        for combo, result in zip(combos, results):
+            if isinstance(result, str) and result:
+                combo["rationale"] = result
+            else:
+                logger.warning(f"Rationale backfill failed: {result}")
+
+    def _persist(
         self,
         img: Image.Image,
-        variants: dict[str, Image.Image],
         context: GenerateRequest,
         combo: Combo,
         prompt_design: dict,
         rationale: str = "",
-    ) -> Tuple[Dict[str, ImageItem], str]:
-        """Package generated variants, persist metadata, and return serialized items."""
-
-        orig = self.utility.from_pil(img)
-        low = self.utility.from_pil(variants["low"])
-        medium = self.utility.from_pil(variants["medium"])
-        high = self.utility.from_pil(variants["high"])
-
+    ) -> str:
+        """Save the generated image with its metadata and return its stamp."""
         type = context.enhancement
-        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        spec_parts = [prompt_design.get(key, "default") for key in self.attr_keys]
+        stamp = _next_stamp()
+        spec_parts = _ATTR_GETTER({**_SPEC_DEFAULTS, **prompt_design})
         short_spec = self.utility._slug("-".join(spec_parts))[:60]
         theme_slug = self.utility._slug(context.theme)
         filename = f"{theme_slug}_{stamp}_{short_spec}.png"
@@ -259,6 +306,29 @@ class Generation:
             type=type,
             theme=context.theme,
         )
+        return stamp
+
+    def _post_loading(
+        self,
+        img: Image.Image,
+        variants: dict[str, Image.Image],
+        context: GenerateRequest,
+        combo: Combo,
+        prompt_design: dict,
+        rationale: str = "",
+        fmt: str = TRANSPORT_FORMAT,
+        raw: bool = False,
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Package generated variants, persist metadata, and return serialized items.
+        raw: encode variants as raw-bytes dicts (Helper.raw_from_pil) instead
+        of base64 ImageItems.
+        """
+
+        orig, low, medium, high = self.utility.from_pil_many(
+            [img, variants["low"], variants["medium"], variants["high"]], fmt, raw
+        )
+        stamp = self._persist(img, context, combo, prompt_design, rationale)
         # stat, images = self.imagine.load_recent_images()
         # recent_img = []
         # if stat:
@@ -273,14 +343,23 @@ class Generation:
 
         return variants, stamp
 
-    def generate_image(self, context: GenerateRequest) -> GenerateResponse:
-        """Generate images synchronously for the provided request context."""
+    def generate_image(
+        self,
+        context: GenerateRequest,
+        fmt: str = TRANSPORT_FORMAT,
+        raw: bool = False,
+    ) -> Union[GenerateResponse, Dict[str, Any]]:
+        """
+        Generate images synchronously for the provided request context.
+        raw: return the response dumped to a dict with each image's bytes
+        under "data" (for binary transports) instead of a GenerateResponse.
+        """
         start = time.time()
         has_default = self.combinations.any_default(context.selections)
         if has_default:
             designs_to_run = self.resolve_designs(context=context)
         else:
-            user_combo = {k: context.selections[k] for k in self.attr_keys}
+            user_combo = {k: context.selections[k] for k in ATTR_KEYS}
             rationale = self.resolve_ratonale(
                 type=context.enhancement, user_combo=user_combo
             )
@@ -299,20 +378,43 @@ class Generation:
                     logger.info(f"No image returned for combo {idx}.")
                     continue
 
-                variants_dict = self._post_loading(
-                    img, variants, context, prompt_design, rationale
+                variants_dict, _ = self._post_loading(
+                    img=img,
+                    variants=variants,
+                    context=context,
+                    combo=combo,
+                    prompt_design=prompt_design,
+                    rationale=combo.get("rationale", ""),
+                    fmt=fmt,
+                    raw=raw,
+                )
+                response_combo = (
+                    Combo(**context.selections)
+                    if isinstance(context.selections, dict)
+                    else Combo()
                 )
+                if raw:
+                    # ImageItem only models base64 payloads, so the raw
+                    # variant dicts go out in an already-dumped response.
+                    return {
+                        "status": 200,
+                        "message": "Image generation successful",
+                        "image_sets": [
+                            {
+                                "combo": response_combo.model_dump(),
+                                "edited": False,
+                                "variants": variants_dict,
+                            }
+                        ],
+                        "recent_images": [],
+                    }
 
                 return GenerateResponse(
                     status=200,
                     message="Image generation successful",
                     image_sets=[
                         ImageSet(
-                            combo=(
-                                Combo(**context.selections)
-                                if isinstance(context.selections, dict)
-                                else Combo()
-                            ),
+                            combo=response_combo,
                             edited=False,
                             variants=variants_dict,
                         )
@@ -322,15 +424,17 @@ class Generation:
             logger.info(f"Image generated in {time.time() - start:.3f} seconds total")
         except Exception as e:
             logger.error(f"Error occurred : {e}")
-            return GenerateResponse(
+            failed = GenerateResponse(
                 message="Image Generation Failed",
             )
+            return failed.model_dump() if raw else failed
 
     async def generate_image_stream(
-        self, context: GenerateRequest
+        self, context: GenerateRequest, fmt: str = TRANSPORT_FORMAT
     ) -> AsyncIterator[bytes]:
         """
         Stream back events as JSON lines:
+        - rationale text deltas (user-picked combos only)
         - prompt
         - variants info
         - each image as it's ready
@@ -339,47 +443,109 @@ class Generation:
         has_default = self.combinations.any_default(context.selections)
         if has_default:
             logger.info(f"Has default: {colored(has_default, 'green')}")
-            designs_to_run = self.resolve_designs(context=context)
+            designs_to_run = await asyncio.to_thread(
+                self.resolve_designs, context=context
+            )
         else:
             logger.info(f"Has default: {colored(has_default, 'red')}")
-            user_combo = {k: context.selections[k] for k in self.attr_keys}
-            rationale = self.resolve_ratonale(
-                type=context.enhancement, user_combo=user_combo
-            )
-            user_combo["rationale"] = rationale if rationale else ""
+            user_combo = {k: context.selections[k] for k in ATTR_KEYS}
+            # filled in below while the image renders
+            user_combo["rationale"] = ""
             designs_to_run = [user_combo]
+        semaphore = asyncio.Semaphore(_GENERATION_CONCURRENCY)
+
+        async def generate_one(idx: int, final_prompt: str):
+            """Generate one combo's image, bounded by the shared semaphore."""
+            async with semaphore:
+                logger.info(f"Generating image for combo {idx}...")
+                # Generation and post-processing block; run them in a worker
+                # thread so the event loop keeps serving other requests.
+                if self.run_mode == "mock":
+                    return await asyncio.to_thread(
+                        self.generate.generate_mock_image, index=3
+                    )
+                return await asyncio.to_thread(
+                    self.generate.generate_with_gemini, final_prompt
+                )
+
+        tasks: List[asyncio.Task] = []
+        rationale_task: asyncio.Task | None = None
         try:
             last_variants_dict: Dict[str, ImageItem] | None = None
             last_recent_img: List[ImageItem] = []
-            for idx, combo in enumerate(designs_to_run, start=1):
-                final_prompt, prompt_design = self._pre_loading(combo, context)
-
+            prepared = [self._pre_loading(combo, context) for combo in designs_to_run]
+            # start every combo at once; results are still consumed in order so
+            # events keep their index sequence
+            tasks = [
+                asyncio.create_task(generate_one(idx, final_prompt))
+                for idx, (final_prompt, _) in enumerate(prepared, start=1)
+            ]
+            # The combiner normally writes each rationale itself; only combos
+            # left with a placeholder get one, concurrently and off the image
+            # path (standard tier, since the result is shown with the image).
+            missing = [c for c in designs_to_run if needs_rationale(c)]
+            if has_default and missing and self.run_mode != "mock":
+                rationale_task = asyncio.create_task(
+                    self._fill_rationales(context.enhancement, missing)
+                )
+            for idx, (combo, (final_prompt, prompt_design), task) in enumerate(
+                zip(designs_to_run, prepared, tasks), start=1
+            ):
                 # send prompt info down
-                yield json.dumps(
+                yield orjson.dumps(
                     {"event": "prompt", "data": final_prompt}
-                ).encode() + b"\n"
-
-                logger.info(f"Generating image for combo {idx}...")
-                # generate image for this combo
-
-                if self.run_mode == "mock":
-                    img, variants = self.generate.generate_mock_image(index=3)
-                else:
-                    img, variants = self.generate.generate_with_gemini(final_prompt)
+                ) + b"\n"
+
+                if not has_default:
+                    # The image prompt does not use the rationale, so stream
+                    # the rationale text down while the image is still rendering.
+                    parts: List[str] = []
+                    try:
+                        async for delta in self.astream_rationale(
+                            type=context.enhancement, user_combo=user_combo
+                        ):
+                            parts.append(delta)
+                            yield orjson.dumps(
+                                {
+                                    "event": "rationale",
+                                    "data": {"index": idx, "delta": delta},
+                                }
+                            ) + b"\n"
+                    except Exception as e:
+                        logger.warning(f"Rationale streaming failed: {e}")
+                    user_combo["rationale"] = "".join(parts).strip()
+
+                img, variants = await task
+                if rationale_task is not None:
+                    await rationale_task
+                    rationale_task = None
 
                 if img is None or variants is None:
                     logger.warning(f"No image returned for combo {idx}.")
-                    yield json.dumps(
+                    yield orjson.dumps(
                         {
                             "event": "error",
                             "data": {"message": "Unable to generate image"},
                         }
-                    ).encode() + b"\n"
+                    ) + b"\n"
                     break
 
-                variants_dict, stamp = self._post_loading(
+                # kick off all encodes at once and emit each variant as soon as
+                # its encode finishes, instead of waiting for the slowest one
+                pending = {
+                    asyncio.wrap_future(
+                        self.utility.submit_from_pil(image, fmt)
+                    ): var_key
+                    for var_key, image in (
+                        ("original", img),
+                        ("low", variants["low"]),
+                        ("medium", variants["medium"]),
+                        ("high", variants["high"]),
+                    )
+                }
+                stamp = await asyncio.to_thread(
+                    self._persist,
                     img=img,
-                    variants=variants,
                     context=context,
                     combo=combo,
                     prompt_design=prompt_design,
@@ -387,20 +553,27 @@ class Generation:
 
                 # stream each variant
                 rationale = combo.get("rationale", "")
-                for var_key, img_item in variants_dict.items():
-                    yield json.dumps(
-                        {
-                            "event": "image_variant",
-                            "data": {
-                                "index": idx,
-                                "id": stamp,
-                                "variant": var_key,
-                                "image": img_item.dict(),
-                                "rationale": rationale,
-                                "combo": combo,
-                            },
-                        }
-                    ).encode() + b"\n"
+                variants_dict: Dict[str, ImageItem] = {}
+                while pending:
+                    done, _ = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        var_key = pending.pop(future)
+                        img_item = variants_dict[var_key] = future.result()
+                        yield orjson.dumps(
+                            {
+                                "event": "image_variant",
+                                "data": {
+                                    "index": idx,
+                                    "id": stamp,
+                                    "variant": var_key,
+                                    "image": img_item.model_dump(),
+                                    "rationale": rationale,
+                                    "combo": combo,
+                                },
+                            }
+                        ) + b"\n"
 
                 # remember last ones for summary
                 last_variants_dict = variants_dict
@@ -410,15 +583,15 @@ class Generation:
 
             # If we never had any designs (just in case)
             if last_variants_dict is None:
-                yield json.dumps(
+                yield orjson.dumps(
                     {
                         "event": "error",
                         "data": {"message": "No designs generated."},
                     }
-                ).encode() + b"\n"
+                ) + b"\n"
                 return
 
-            yield json.dumps(
+            yield orjson.dumps(
                 {
                     "event": "summary",
                     "data": {
@@ -429,18 +602,18 @@ class Generation:
                                 Combo(**context.selections)
                                 if isinstance(context.selections, dict)
                                 else Combo()
-                            ).dict(),
+                            ).model_dump(),
                             "edited": False,
                             "variants": {
-                                k: v.dict() for k, v in last_variants_dict.items()
+                                k: v.model_dump() for k, v in last_variants_dict.items()
                             },
                         },
-                        "recent_images": [img.dict() for img in last_recent_img],
+                        "recent_images": [img.model_dump() for img in last_recent_img],
                     },
                 }
-            ).encode() + b"\n"
+            ) + b"\n"
 
-            yield json.dumps(
+            yield orjson.dumps(
                 {
                     "event": "done",
                     "data": {
@@ -450,11 +623,15 @@ class Generation:
                         "type": context.enhancement,
                     },
                 }
-            ).encode() + b"\n"
+            ) + b"\n"
             logger.info(f"Image generated in {time.time() - start:.3f} seconds total")
         except Exception as e:
-            logger.error(f"Error occurred : {e}")
-            traceback.print_exc()
-            yield json.dumps(
+            logger.exception(f"Error occurred : {e}")
+            yield orjson.dumps(
                 {"event": "error", "data": "Image Generation Failed"}
-            ).encode() + b"\n"
+            ) + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            if rationale_task is not None:
+                rationale_task.cancel()
@@ -2,6 +2,7 @@
 
 from PIL import Image
 from typing import List
+from functools import lru_cache
 from src.models.generate import (
     GenerateResponse,
 )
@@ -18,16 +19,19 @@ class ImageGeneration:
     """
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_image_generation() -> GenerateResponse:
-        """Provide the Generation service for API handlers."""
+        """Provide the process-wide Generation service for API handlers."""
         return Generation()
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_imagine() -> List[Image.Image]:
-        """Return the Imagine model used for persistence and retrieval."""
+        """Return the process-wide Imagine model for persistence and retrieval."""
         return Imagine()
 
     @staticmethod
-    def get_image_generation_options():
-        """Return default option catalog used by generation endpoints."""
+    @lru_cache(maxsize=1)
+    def get_image_generation_options() -> Options:
+        """Return the process-wide option catalog used by generation endpoints."""
         return Options()
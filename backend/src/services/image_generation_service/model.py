@@ -4,21 +4,32 @@ from types import SimpleNamespace
 import os
 import io
 import re
-import base64
-import json
-import requests
+import cv2
+import pybase64
+import numpy as np
+import orjson
+import tempfile
 from PIL import Image
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from dotenv import load_dotenv
 from typing import Any, Optional, List, Tuple, Dict
 
-from src.utility.utils import Helper
+from src.utility.utils import (
+    ATTR_KEYS,
+    Helper,
+    TRANSPORT_FORMAT,
+    compile_template,
+    render_template,
+)
 from src.config.themes import THEMES
 from src.config.mock import Mock
+from src.utility.cache import LRUCache
 from src.utility.path_finder import Finder
+from src.utility.http_client import HttpClients
 from src.config.themes import THEMES_PRESETS_MIN, DEFAULTS
-from src.models.generate import SidebarImage, Combo, RelatedRequest
+from src.models.generate import SidebarImage, Combo, RelatedRequest, ImageItem
 from src.services.post_service.post_processing import PostProcessing
 from src.utility.path_finder import Finder
 from src.utility.logger import AppLogger
@@ -28,6 +39,64 @@ path_finder = Finder()
 env_path = path_finder.get_directory("root") / ".env"
 load_dotenv(env_path)
 
+# Encoded variants per (image path, format) as (file mtime, variants), so a
+# rewrite invalidates the entry. Shared across the per-request Imagine instances
+# and bounded like the page cache: gallery paging would otherwise keep every
+# image's base64 variants for the life of the process.
+_VARIANT_CACHE = LRUCache(
+    maxsize=64,
+    maxbytes=96 * 1024 * 1024,
+    weigh=lambda entry: sum(len(item.data_b64) for item in entry[1].values()),
+)
+# Image metadata is an append-only JSON Lines log: one record per save,
+# a tombstone per delete; later lines win. Older trees kept a single JSON
+# object, which is migrated on first use.
+METADATA_FILE = "image_metadata.jsonl"
+LEGACY_METADATA_FILE = "image_metadata.json"
+# Folded metadata per log path, tagged with the (mtime, bytes consumed) it
+# was built from so appends are read incrementally.
+_METADATA_CACHE: Dict[str, Tuple[int, int, Dict]] = {}
+# Stored originals with this header can be streamed to clients untouched.
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@lru_cache(maxsize=8)
+def _sorted_image_files(output_dir: str, dir_mtime_ns: int) -> Tuple[str, ...]:
+    """
+    Image filenames in output_dir, newest first.
+    Keyed on the directory's mtime so the scan only reruns after files are
+    added or removed.
+    """
+    # One stat per entry (DirEntry caches it) rather than one per sort comparison.
+    with os.scandir(output_dir) as it:
+        entries = [
+            (e.stat().st_mtime_ns, e.name)
+            for e in it
+            if e.is_file() and e.name.lower().endswith((".png", ".jpg", ".jpeg"))
+        ]
+    entries.sort(reverse=True)
+    return tuple(name for _, name in entries)
+
+
+# {theme_slug}_{YYYYMMDD_HHMMSS}_{short_spec}.png, see _parse_image_filename.
+_IMAGE_FILENAME_RE = re.compile(r"^(.+?)_(\d{8}_\d{6})_(.+)\.(?:png|jpg|jpeg)$")
+
+
+@lru_cache(maxsize=8)
+def _stamp_index(output_dir: str, dir_mtime_ns: int) -> Dict[str, Tuple[str, ...]]:
+    """
+    Image filenames in output_dir grouped by stamp (image id), in directory
+    order. Keyed on the directory's mtime like _sorted_image_files, so
+    lookups by id skip the scan until files are added or removed.
+    """
+    index: Dict[str, List[str]] = {}
+    with os.scandir(output_dir) as it:
+        for e in it:
+            match = _IMAGE_FILENAME_RE.match(e.name)
+            if match and e.is_file():
+                index.setdefault(match.group(2), []).append(e.name)
+    return {stamp: tuple(names) for stamp, names in index.items()}
+
 
 class _SafeDict(dict):
     def __missing__(self, key):
@@ -35,6 +104,35 @@ class _SafeDict(dict):
         return ""
 
 
+def _clean_value(v: Any) -> str:
+    """Stringify a template value, joining iterables and blanking None."""
+    if v is None:
+        return ""
+    if isinstance(v, (list, tuple, set)):
+        return ", ".join(map(str, v))
+    return str(v)
+
+
+# Theme presets merged over the defaults and stringified once at import;
+# build_prompt only cleans the values a request overrides.
+_CLEAN_THEMES: Dict[str, Dict[str, str]] = {
+    theme: {k: _clean_value(v) for k, v in {**DEFAULTS, **preset}.items()}
+    for theme, preset in THEMES_PRESETS_MIN.items()
+}
+
+
+@lru_cache(maxsize=512)
+def _render_prompt(template: str, fields: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    Fill a prompt template with cleaned string fields and collapse whitespace.
+    Keyed on the template text too, so an edited templates.yml re-renders.
+    """
+    # pre-parsed fragments skip re-walking the format mini-language each fill
+    text = render_template(compile_template(template), _SafeDict(fields))
+    # collapse whitespace to keep prompt tidy
+    return " ".join(text.split())
+
+
 class Imagine:
     """Handle prompt assembly, storage, retrieval, and related-image lookups.
 
@@ -52,7 +150,6 @@ class Imagine:
         self.post_processing = PostProcessing()
         self.mock = Mock()
         self.strength_index = {"Light": 0, "Medium": 1, "Strong": 2}
-        self.attr_keys = ("color_palette", "pattern", "motif", "style", "finish")
 
     def build_final_prompt(
         self, subject: str, theme_name: str, strength_label: str
@@ -72,15 +169,7 @@ class Imagine:
 
     def _safe_clean(self, d: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize values into strings while handling None and iterables."""
-        out = {}
-        for k, v in d.items():
-            if v is None:
-                out[k] = ""
-            elif isinstance(v, (list, tuple, set)):
-                out[k] = ", ".join(map(str, v))
-            else:
-                out[k] = str(v)
-        return out
+        return {k: _clean_value(v) for k, v in d.items()}
 
     def _apply_design_overrides(
         self, base: Dict[str, Any], design: Optional[Dict[str, Any]]
@@ -135,28 +224,30 @@ class Imagine:
     ) -> str:
         """Build the prompt text for image generation using templates and overrides."""
         # start from global defaults, then theme preset
-        if theme_key not in THEMES_PRESETS_MIN:
+        if theme_key not in _CLEAN_THEMES:
             raise KeyError(f"Unknown theme: {theme_key}")
 
-        base = {**DEFAULTS, **THEMES_PRESETS_MIN[theme_key]}
-        base["theme_label"] = theme_key
+        base = dict(_CLEAN_THEMES[theme_key])
+        base["theme_label"] = str(theme_key)
         base["extra"] = (extra or "").strip() or "—"
 
         base = self._apply_design_overrides(base, design)
+        # only overridden values can still need stringifying
+        for k, v in base.items():
+            if not isinstance(v, str):
+                base[k] = _clean_value(v)
 
         # finalize
         prompt_template = self.helper.load_template(template=type)
         logger.info(f"Loaded template for type: {type}")
-        text = prompt_template.format_map(_SafeDict(self._safe_clean(base)))
-        # collapse whitespace to keep prompt tidy
-        return " ".join(text.split())
+        # cleaned values are all strings, so the fields are always hashable
+        return _render_prompt(prompt_template, tuple(base.items()))
 
     def mock_response_from_file(self, path: str):
         """Construct a fake OpenAI-like response from a local image file."""
         # Read and encode the image
         with open(path, "rb") as f:
-            img_bytes = f.read()
-        b64_str = base64.b64encode(img_bytes).decode("utf-8")
+            b64_str = pybase64.b64encode_as_string(f.read())
 
         # Match OpenAI's response format: resp.data[0].b64_json
         fake_item = SimpleNamespace(b64_json=b64_str, url=None)
@@ -171,15 +262,25 @@ class Imagine:
         return self.mock.mock_designs
 
     def b64_to_image(self, b64_str: str) -> Image.Image:
-        """Decode a base64 string into a RGBA PIL Image."""
-        img_bytes = base64.b64decode(b64_str)
-        return Image.open(io.BytesIO(img_bytes)).convert("RGBA")
+        """Decode a base64 string into an RGB PIL Image."""
+        img_bytes = pybase64.b64decode(b64_str)
+        return Image.open(io.BytesIO(img_bytes)).convert("RGB")
+
+    def bytes_to_rgb_array(self, data: bytes) -> np.ndarray:
+        """
+        Decode encoded image bytes straight to a contiguous RGB array with
+        OpenCV, skipping the PIL image and its mode conversions.
+        """
+        arr = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if arr is None:
+            raise ValueError("Could not decode image bytes.")
+        return cv2.cvtColor(arr, cv2.COLOR_BGR2RGB, dst=arr)
 
     def image_to_base64(self, img_path):
         """Convert image to base64 for inline display."""
+        # SIMD encode straight to str: no intermediate base64 bytes object
         with open(img_path, "rb") as f:
-            data = f.read()
-        return base64.b64encode(data).decode("utf-8")
+            return pybase64.b64encode_as_string(f.read())
 
     def ensure_mode_rgba(self, img: Image.Image) -> Image.Image:
         """Guarantee the provided image is in RGBA mode."""
@@ -191,9 +292,7 @@ class Imagine:
     def pil_to_png_bytes(self, img: Image.Image) -> bytes:
         """Encode a PIL image to PNG bytes after enforcing RGBA mode."""
         img = self.ensure_mode_rgba(img)  # <-- ensure acceptable mode
-        buf = io.BytesIO()
-        img.save(buf, format="PNG", optimize=True)
-        return buf.getvalue()
+        return self.helper.pil_to_bytes(img, "PNG")
 
     def pick_openai_size_from_image(self, img: Image.Image) -> str:
         """Map current image size to a supported square size."""
@@ -221,11 +320,11 @@ class Imagine:
             return part.inline_data.data  # already bytes
         if getattr(part, "file_data", None) and getattr(part.file_data, "uri", None):
             # Fallback if SDK surfaces uri
-            r = requests.get(part.file_data.uri, timeout=60)
+            r = HttpClients.get_session().get(part.file_data.uri, timeout=60)
             r.raise_for_status()
             return r.content
         if getattr(part, "image_url", None):  # very rare alt surface
-            r = requests.get(part.image_url, timeout=60)
+            r = HttpClients.get_session().get(part.image_url, timeout=60)
             r.raise_for_status()
             return r.content
         logger.warning("Image Part is Empty")
@@ -241,41 +340,100 @@ class Imagine:
         filename: str = "",
         type: str = "",
         theme: str = "",
-        json_path: str = "image_metadata.json",
+        json_path: str = METADATA_FILE,
     ) -> None:
         """
-        Save image to disk and store its combination metadata in a JSON file.
+        Save image to disk and append its combination metadata to a JSON Lines log.
         """
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         img.save(save_path)
 
-        # Load existing metadata if present
-        json_pathd = self.path.get_directory("output")
-        json_path_new = json_pathd / json_path
-        if os.path.exists(json_path_new):
-            with open(json_path_new, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
-        else:
-            metadata = {}
-
-        # Save metadata using image path as key
-        metadata[filename] = {
-            "id": id,
-            "theme": theme,
-            "combination": combination,
-            "type": type,
-            "rationale": rationale,
-            "timestamp": datetime.now().isoformat(),
-        }
+        # Append one record; the log is never rewritten on save
+        output_dir = self.path.get_directory("output")
+        self._metadata_path(output_dir)  # migrate a legacy file before appending
+        self._append_metadata(
+            output_dir / json_path,
+            {
+                "filename": filename,
+                "id": id,
+                "theme": theme,
+                "combination": combination,
+                "type": type,
+                "rationale": rationale,
+                "timestamp": datetime.now().isoformat(),
+            },
+        )
 
-        # Write back to JSON
-        with open(json_path_new, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+    def _metadata_path(self, output_dir: Path) -> Path:
+        """Path of the metadata log, migrating a legacy JSON file on first use."""
+        metadata_path = output_dir / METADATA_FILE
+        legacy_path = output_dir / LEGACY_METADATA_FILE
+        if not metadata_path.exists() and legacy_path.exists():
+            legacy = orjson.loads(legacy_path.read_bytes())
+            self._write_metadata(
+                metadata_path,
+                [{"filename": fname, **meta} for fname, meta in legacy.items()],
+            )
+            legacy_path.unlink(missing_ok=True)
+            logger.info("Migrated image metadata to JSON Lines")
+        return metadata_path
+
+    def _read_metadata(self, metadata_path: Path) -> Dict:
+        """
+        Return the metadata log folded into {filename: record}, or {} if it
+        does not exist. Cached per file; after an append only the new lines
+        are parsed. Treat the result as read-only and copy before modifying.
+        """
+        try:
+            st = metadata_path.stat()
+        except FileNotFoundError:
+            return {}
+        key = str(metadata_path)
+        cached = _METADATA_CACHE.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+
+        if cached and cached[1] <= st.st_size:
+            # appended since the last read: fold just the tail
+            offset, metadata = cached[1], dict(cached[2])
+        else:
+            offset, metadata = 0, {}
+        with open(metadata_path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+        # stop at the last complete line; a partial one is re-read next time
+        complete = chunk.rfind(b"\n") + 1
+        for line in chunk[:complete].splitlines():
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            fname = record.pop("filename")
+            if record.get("deleted"):
+                metadata.pop(fname, None)
+            else:
+                metadata[fname] = record
+        _METADATA_CACHE[key] = (st.st_mtime_ns, offset + complete, metadata)
+        return metadata
+
+    def _append_metadata(self, metadata_path: Path, record: Dict) -> None:
+        """Append one record to the metadata log in a single write."""
+        with open(metadata_path, "ab") as f:
+            f.write(orjson.dumps(record) + b"\n")
+
+    def _write_metadata(self, metadata_path: Path, records: List[Dict]) -> None:
+        """Atomically replace the metadata log with the given records."""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=metadata_path.parent, prefix=f".{metadata_path.name}."
+        )
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"".join(orjson.dumps(r) + b"\n" for r in records))
+        os.replace(tmp_path, metadata_path)
+        _METADATA_CACHE.pop(str(metadata_path), None)
 
     def _combination_to_badges(self, combo: dict) -> list[str]:
         """Turn a combination dictionary into human-friendly badge labels."""
         labels: list[str] = []
-        for key in self.attr_keys:
+        for key in ATTR_KEYS:
             raw = combo.get(key)
             if not raw or raw == "default":
                 continue
@@ -289,16 +447,26 @@ class Imagine:
         Returns the output directory and loaded metadata dict.
         """
         output_dir = self.path.get_directory("output")
-        metadata_path = output_dir / "image_metadata.json"
-
-        if metadata_path.exists():
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
-        else:
-            metadata = {}
-
+        metadata = self._read_metadata(self._metadata_path(output_dir))
         return output_dir, metadata
 
+    def storage_version(self) -> Tuple[int, int, int]:
+        """
+        (output dir mtime, metadata log mtime, metadata log size) in ns/bytes.
+        Changes whenever an image is saved, edited or deleted, so results
+        derived from the gallery can be cached against it.
+        """
+        output_dir = self.path.get_directory("output")
+        try:
+            dir_mtime = output_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0, 0, 0
+        try:
+            log = self._metadata_path(output_dir).stat()
+        except FileNotFoundError:
+            return dir_mtime, 0, 0
+        return dir_mtime, log.st_mtime_ns, log.st_size
+
     def _parse_image_filename(self, filename: str) -> Optional[Tuple[str, str, str]]:
         """
         Parse filename into (theme_slug, stamp, short_spec).
@@ -306,8 +474,7 @@ class Imagine:
         Expected format:
         {theme_slug}_{YYYYMMDD_HHMMSS}_{short_spec}.png
         """
-        filename_regex = re.compile(r"^(.+?)_(\d{8}_\d{6})_(.+)\.(?:png|jpg|jpeg)$")
-        match = filename_regex.match(filename)
+        match = _IMAGE_FILENAME_RE.match(filename)
         if not match:
             return None
         return match.groups()
@@ -317,6 +484,7 @@ class Imagine:
         output_dir: Path,
         filename: str,
         metadata: Dict,
+        fmt: str = TRANSPORT_FORMAT,
     ) -> Optional[SidebarImage]:
         """
         Given a filename and metadata, build a SidebarImage instance.
@@ -332,7 +500,7 @@ class Imagine:
         if not meta:
             combo = {}
         else:
-            combo = meta.get("combination", meta)
+            combo = dict(meta.get("combination", meta))
             rationale = meta.get("rationale", "")
             type = meta.get("type", "")
             theme = meta.get("theme", "")
@@ -344,13 +512,34 @@ class Imagine:
         if not img_path.exists():
             return None
 
+        return SidebarImage(
+            id=stamp,
+            theme=theme,
+            type=type,
+            name=self._combination_to_badges(combo),
+            variants=self._load_variants(img_path, fmt),
+            combo=Combo(**combo),
+        )
+
+    def _load_variants(
+        self, img_path: Path, fmt: str = TRANSPORT_FORMAT
+    ) -> Dict[str, ImageItem]:
+        """
+        Return encoded original/low/medium/high variants for an image on disk.
+        Reuses the cached encodes while the file's mtime is unchanged.
+        """
+        key = (str(img_path), fmt.upper())
+        mtime = img_path.stat().st_mtime_ns
+        cached = _VARIANT_CACHE.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
         # Load image and convert to ImageItem
         img = Image.open(img_path)
         lowp, mediump, highp = self.post_processing.apply_post_processing(img)
-        org = self.helper.from_pil(img)
-        low = self.helper.from_pil(lowp)
-        medium = self.helper.from_pil(mediump)
-        high = self.helper.from_pil(highp)
+        org, low, medium, high = self.helper.from_pil_many(
+            [img, lowp, mediump, highp], fmt
+        )
 
         variants = {
             "original": org,
@@ -358,29 +547,28 @@ class Imagine:
             "medium": medium,
             "high": high,
         }
-        return SidebarImage(
-            id=stamp,
-            theme=theme,
-            type=type,
-            name=self._combination_to_badges(combo),
-            variants=variants,
-            combo=Combo(**combo),
-        )
+        _VARIANT_CACHE.put(key, (mtime, variants))
+        return variants
 
-    def _iter_image_filenames(self, output_dir: Path):
-        """
-        Yield image filenames in output_dir.
-        """
-        if not output_dir.exists():
-            return
-        for f in os.listdir(output_dir):
-            if f.lower().endswith((".png", ".jpg", ".jpeg")):
-                yield f
+    def _evict_missing_variants(self) -> None:
+        """Drop cached variants whose image file no longer exists."""
+        for key in _VARIANT_CACHE.keys():
+            if not os.path.exists(key[0]):
+                _VARIANT_CACHE.pop(key)
+
+    def _filenames_for_id(self, output_dir: Path, image_id: str) -> Tuple[str, ...]:
+        """Stored image filenames whose stamp is image_id (empty if none)."""
+        try:
+            dir_mtime = output_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return ()
+        return _stamp_index(str(output_dir), dir_mtime).get(str(image_id), ())
 
     def load_recent_images(
         self,
         offset: int = 0,
         limit: int | None = 6,
+        fmt: str = TRANSPORT_FORMAT,
     ) -> tuple[list[SidebarImage], int]:
         """
         Load recent images from the output folder.
@@ -394,12 +582,11 @@ class Imagine:
 
         if not output_dir.exists():
             return False, []
+        self._evict_missing_variants()
 
         # Get image files sorted by latest mtime
-        all_files = sorted(
-            list(self._iter_image_filenames(output_dir)),
-            key=lambda x: os.path.getmtime(output_dir / x),
-            reverse=True,
+        all_files = _sorted_image_files(
+            str(output_dir), output_dir.stat().st_mtime_ns
         )
         total = len(all_files)
         # Normalize offset/limit
@@ -410,7 +597,9 @@ class Imagine:
         slice_files = all_files[safe_offset : safe_offset + safe_limit]
 
         for fname in slice_files:
-            sidebar_image = self._build_sidebar_image(output_dir, fname, metadata)
+            sidebar_image = self._build_sidebar_image(
+                output_dir, fname, metadata, fmt
+            )
             if sidebar_image:
                 recent_images.append(sidebar_image)
 
@@ -422,6 +611,7 @@ class Imagine:
         min_matches: int = 3,
         limit: int | None = 12,
         offset: int = 0,
+        fmt: str = TRANSPORT_FORMAT,
     ) -> Tuple[List[SidebarImage], int]:
         """
         Find related images based on:
@@ -459,7 +649,7 @@ class Imagine:
 
             if theme == theme_slug and type == wanted_type:
                 match_count = sum(
-                    1 for key in self.attr_keys if selections.get(key) == combo.get(key)
+                    1 for key in ATTR_KEYS if selections.get(key) == combo.get(key)
                 )
                 if match_count >= min_matches:
                     fname = key
@@ -475,7 +665,9 @@ class Imagine:
 
         related_files: List[SidebarImage] = []
         for fname in slice_fnames:
-            sidebar_image = self._build_sidebar_image(output_dir, fname, metadata)
+            sidebar_image = self._build_sidebar_image(
+                output_dir, fname, metadata, fmt
+            )
             if not sidebar_image:
                 logger.error(
                     f"_build_sidebar_image returned None for related file {fname}"
@@ -496,19 +688,9 @@ class Imagine:
         if not output_dir.exists():
             return False
 
-        target_fname = None
-
         # Find matching file
-        for fname in self._iter_image_filenames(output_dir):
-            parsed = self._parse_image_filename(fname)
-            if not parsed:
-                continue
-
-            file_theme_slug, stamp, short_spec = parsed
-
-            if str(stamp) == str(image_id):
-                target_fname = fname
-                break
+        names = self._filenames_for_id(output_dir, image_id)
+        target_fname = names[0] if names else None
 
         if not target_fname:
             logger.warning("target image not found")
@@ -519,16 +701,14 @@ class Imagine:
             file_path.unlink()  # delete file
             logger.info(f"Image Deleted for id :{image_id}")
             # Also delete metadata entry if exists
-            output_dir_metadata = output_dir / "image_metadata.json"
+            output_dir_metadata = self._metadata_path(output_dir)
             if output_dir_metadata.exists():
                 try:
-                    with open(output_dir_metadata, "r+") as f:
-                        data = json.load(f)
-                        if target_fname in data:
-                            del data[target_fname]
-                            f.seek(0)
-                            f.truncate()
-                            json.dump(data, f, indent=2)
+                    if target_fname in metadata:
+                        self._append_metadata(
+                            output_dir_metadata,
+                            {"filename": target_fname, "deleted": True},
+                        )
                 except Exception:
                     pass  # don't fail delete if metadata update fails
 
@@ -545,7 +725,7 @@ class Imagine:
         """
         deleted_files: int = 0
         output_dir = self.path.get_directory("output")
-        metadata_path = output_dir / "image_metadata.json"
+        metadata_path = self._metadata_path(output_dir)
 
         # Delete all files in the image directory
         for file in output_dir.iterdir():
@@ -556,13 +736,9 @@ class Imagine:
                 except Exception as e:
                     logger.error(f"Failed to delete file {file}: {e}")
 
-        # Clear metadata.json
+        # Clear the metadata log
         try:
-            # If you store a dict, use {}; if a list, use [].
-            empty_metadata = {}
-            metadata_path.write_text(
-                json.dumps(empty_metadata, indent=2), encoding="utf-8"
-            )
+            self._write_metadata(metadata_path, [])
         except Exception as e:
             logger.error(f"Failed to clear metadata.json: {e}")
             return {
@@ -573,19 +749,13 @@ class Imagine:
         logger.warning(f"Deleted {deleted_files}")
         return {"success": True, "deleted_files": deleted_files}
 
-    def get_image_bytes_for_download(
-        self,
-        image_id: str,
-        level: str = "org",
-    ) -> Tuple[bytes, str, str]:
+    def _locate_download(
+        self, image_id: str, level: str
+    ) -> Tuple[Optional[Path], str]:
         """
-        Returns (raw_bytes, mime_type, download_filename) for the given
-        image id and level in ["org", "low", "med", "high"].
-
-        Only the original is stored on disk; low/med/high are generated
-        on the fly via post-processing.
+        Resolve (stored file path, normalized level) for a download request,
+        or (None, "") when the level is unknown or no stored file matches.
         """
-        base: Tuple[bytes, str, str] = None, "", ""
         # Normalize level names
         level = level.lower()
         level_map = {
@@ -598,74 +768,114 @@ class Imagine:
             "edited": "edited",
         }
         if level not in level_map:
-            return base
-
-        normalized_level = level_map[level]
+            return None, ""
 
         output_dir, _ = self._get_output_dir_and_metadata()
 
         if not output_dir.exists():
-            return base
+            return None, ""
 
         target_fname = None
 
         # Find the file by stamp (image_id)
-        for fname in self._iter_image_filenames(output_dir):
-            parsed = self._parse_image_filename(fname)
-            if not parsed:
-                continue
-
-            file_theme_slug, stamp, short_spec = parsed
-            if str(stamp) != str(image_id):
-                continue
-
-            # stamp == image_id
+        for fname in self._filenames_for_id(output_dir, image_id):
             if level != "edited":
                 target_fname = fname
                 break
 
             # level == "edited"
+            short_spec = self._parse_image_filename(fname)[2]
             if "edited" in short_spec.split("_"):
                 target_fname = fname
                 break
 
         if not target_fname:
-            return base
+            return None, ""
 
         file_path = output_dir / target_fname
         if not file_path.exists():
-            return base
+            return None, ""
+        return file_path, level_map[level]
+
+    @staticmethod
+    def _download_name(file_path: Path, normalized_level: str) -> str:
+        """Attachment filename for a stored image at the given level."""
+        stem = file_path.stem
+        if normalized_level == "original":
+            return f"{stem}.png"
+        return f"{stem}_{normalized_level}.png"
 
+    def download_etag(self, image_id: str, level: str = "org") -> Optional[str]:
+        """
+        Entity tag for a download, built from the stored file's mtime and size
+        plus the level, so generated variants revalidate without being rebuilt.
+        """
+        file_path, normalized_level = self._locate_download(image_id, level)
+        if file_path is None:
+            return None
+        st = file_path.stat()
+        return f'"{st.st_mtime_ns:x}-{st.st_size:x}-{normalized_level}"'
+
+    def get_image_path_for_download(
+        self,
+        image_id: str,
+        level: str = "org",
+    ) -> Tuple[Optional[Path], str, str]:
+        """
+        Returns (file_path, mime_type, download_filename) when the requested
+        download is a stored PNG that can be served from disk unchanged, else
+        (None, "", ""); callers then fall back to get_image_bytes_for_download.
+        """
+        file_path, normalized_level = self._locate_download(image_id, level)
+        if file_path is None or normalized_level not in ("original", "edited"):
+            return None, "", ""
         try:
-            img = Image.open(file_path).convert("RGBA")
-        except Exception as e:
+            with open(file_path, "rb") as fh:
+                if fh.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+                    return None, "", ""
+        except OSError as e:
             logger.error(f"Failed to open image for download: {e}")
-            return base
+            return None, "", ""
+        download_name = self._download_name(file_path, normalized_level)
+        return file_path, "image/png", download_name
 
-        # --- Choose which image to send ---
-        if normalized_level == "original" or normalized_level == "edited":
-            selected_img = img
-        else:
-            # Generate low / medium / high on the fly
-            low, med, high = self.post_processing.apply_post_processing(img)
-            variant_map = {
-                "low": low,
-                "medium": med,
-                "high": high,
-            }
-            selected_img = variant_map[normalized_level]
+    def get_image_bytes_for_download(
+        self,
+        image_id: str,
+        level: str = "org",
+    ) -> Tuple[bytes, str, str]:
+        """
+        Returns (raw_bytes, mime_type, download_filename) for the given
+        image id and level in ["org", "low", "med", "high"].
 
-        # --- Convert selected PIL image to bytes ---
-        buf = io.BytesIO()
-        fmt = "PNG"
-        selected_img.save(buf, format=fmt)
-        raw_bytes = buf.getvalue()
+        Only the original is stored on disk; low/med/high are generated
+        on the fly via post-processing.
+        """
+        base: Tuple[bytes, str, str] = None, "", ""
+        file_path, normalized_level = self._locate_download(image_id, level)
+        if file_path is None:
+            return base
 
-        mime_type = "image/png"
-        stem = file_path.stem
-        if normalized_level == "original":
-            download_name = f"{stem}.png"
-        else:
-            download_name = f"{stem}_{normalized_level}.png"
+        try:
+            data = file_path.read_bytes()
+            if normalized_level in ("original", "edited"):
+                # Stored PNGs are sent as-is; anything else is re-encoded
+                img = Image.open(io.BytesIO(data))
+                raw_bytes = (
+                    data
+                    if img.format == "PNG"
+                    else self.helper.pil_to_bytes(img.convert("RGBA"), "PNG")
+                )
+            else:
+                # Generate only the requested low / medium / high variant on
+                # the fly, decoding straight to an array for post-processing
+                selected_img = self.post_processing.enhance_image(
+                    self.bytes_to_rgb_array(data), strength=normalized_level
+                )
+                raw_bytes = self.helper.pil_to_bytes(selected_img, "PNG")
+        except Exception as e:
+            logger.error(f"Failed to open image for download: {e}")
+            return base
 
-        return raw_bytes, mime_type, download_name
+        download_name = self._download_name(file_path, normalized_level)
+        return raw_bytes, "image/png", download_name
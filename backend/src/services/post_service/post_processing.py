@@ -1,14 +1,68 @@
 """Image post-processing utilities for enhancing generated artwork."""
 
+import os
 import cv2
+import threading
 import numpy as np
 from PIL import Image
-from typing import Tuple
+from typing import Tuple, Union
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 from src.utility.logger import AppLogger
 
 logger = AppLogger.get_logger(__name__)
 
+# Every 8-bit saturation/value level, for building per-level lookup tables.
+_LEVELS = np.arange(256, dtype=np.float32)
+
+
+@lru_cache(maxsize=16)
+def _vibrance_lut(vib: float) -> np.ndarray:
+    """Saturation vibrance curve as a uint8 table (same float32 math as before)."""
+    s_n = _LEVELS / 255.0
+    return np.clip((s_n + vib * (1.0 - s_n)) * 255.0, 0, 255).astype(np.uint8)
+
+
+def _gain_lut(gain: float) -> np.ndarray:
+    """uint8 table for clip(x * gain); same float math as scaling the image."""
+    return np.clip(_LEVELS * gain, 0, 255).astype(np.uint8)
+
+
+def _luminance(img_rgb: np.ndarray) -> np.ndarray:
+    """
+    Luminance approximation in float32 (keeps grays neutral if scaled
+    equally), converting one channel at a time instead of the whole image.
+    """
+    return (
+        0.2126 * img_rgb[..., 0].astype(np.float32)
+        + 0.7152 * img_rgb[..., 1].astype(np.float32)
+        + 0.0722 * img_rgb[..., 2].astype(np.float32)
+    )
+
+
+# CLAHE.apply() keeps scratch buffers on the instance, so instances are
+# reused per thread rather than shared across the pool.
+_CLAHE_LOCAL = threading.local()
+
+
+def _clahe(clip_limit: float):
+    """Return this thread's CLAHE instance for clip_limit, creating it once."""
+    cache = getattr(_CLAHE_LOCAL, "cache", None)
+    if cache is None:
+        cache = _CLAHE_LOCAL.cache = {}
+    clahe = cache.get(clip_limit)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+        cache[clip_limit] = clahe
+    return clahe
+
+
+@lru_cache(maxsize=4)
+def _background_luts(s_thresh: float, v_thresh: float) -> Tuple[np.ndarray, ...]:
+    """Per-level masks for low saturation and high value (near-white paper)."""
+    return _LEVELS / 255.0 < s_thresh, _LEVELS / 255.0 > v_thresh
+
 
 class PostProcessing:
     """Encapsulates enhancement routines for different strength presets.
@@ -18,9 +72,14 @@ class PostProcessing:
     Designed to be reusable across generation and editing flows.
     """
 
+    # OpenCV releases the GIL, so the strengths run on separate cores.
+    _EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="postproc")
+
     def __init__(self):
         """Initialize post-processing version metadata."""
         self.version = "1.2"
+        # "full" runs the pipeline per strength; "fast" blends one "high" pass
+        self.mode = os.getenv("POST_PROCESSING_MODE", "full")
 
     def _rgb_to_lab(self, img_rgb):
         """Convert an RGB image array to LAB color space."""
@@ -32,114 +91,157 @@ class PostProcessing:
 
     def _vibrance_hsv(self, img_rgb, vib=0.18):
         """Vibrance: boost saturation more for low-sat pixels, protect high-sat."""
-        hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV).astype(np.float32)
-        h, s, v = cv2.split(hsv)
-        s_norm = s / 255.0
-        boost = vib * (1.0 - s_norm)  # more boost where s is low
-        s = np.clip((s_norm + boost) * 255.0, 0, 255)
-        hsv = cv2.merge([h, s, v]).astype(np.uint8)
+        hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV)
+        # more boost where s is low; a uint8 lookup instead of float math
+        hsv[..., 1] = _vibrance_lut(vib)[hsv[..., 1]]
         return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
 
     def _white_point(self, img_rgb, percentile=99.2, target=245):
         """Gentle per-channel white balance by stretching top percentile to target."""
         arr = img_rgb.astype(np.float32)
-        for c in range(3):
-            p = np.percentile(arr[..., c], percentile)
-            if p < 1:  # avoid div by zero
-                continue
-            gain = target / p
-            arr[..., c] = np.clip(arr[..., c] * gain, 0, 255)
+        # All three channel percentiles in one pass over the pixels.
+        p = np.percentile(arr.reshape(-1, 3), percentile, axis=0)
+        # p < 1 keeps the channel unchanged (avoid div by zero)
+        gains = np.where(p < 1, 1.0, target / np.maximum(p, 1.0)).astype(np.float32)
+        np.multiply(arr, gains, out=arr)
+        np.clip(arr, 0, 255, out=arr)
         return arr.astype(np.uint8)
 
-    def _unsharp(self, img_rgb, amount=0.35, sigma=1.0):
-        """Apply a light unsharp mask for subtle edge clarity."""
-        blur = cv2.GaussianBlur(img_rgb, (0, 0), sigma)
-        return cv2.addWeighted(img_rgb, 1 + amount, blur, -amount, 0)
+    def _unsharp(self, img_rgb, amount=0.35, sigma=1.0, blur_buf=None, dst=None):
+        """
+        Apply a light unsharp mask for subtle edge clarity.
+        blur_buf/dst let callers reuse buffers; dst may alias img_rgb.
+        """
+        blur = cv2.GaussianBlur(img_rgb, (0, 0), sigma, dst=blur_buf)
+        return cv2.addWeighted(img_rgb, 1 + amount, blur, -amount, 0, dst=dst)
 
     def _white_point_neutral(self, img_rgb, percentile=99.2, target=245):
         """Neutral-preserving white point: compute a single gain from luminance."""
-        arr = img_rgb.astype(np.float32)
-        # luminance approximation (keeps grays neutral if scaled equally)
-        Y = 0.2126 * arr[..., 0] + 0.7152 * arr[..., 1] + 0.0722 * arr[..., 2]
-        p = np.percentile(Y, percentile)
+        p = np.percentile(_luminance(img_rgb), percentile)
         gain = target / max(p, 1.0)
-        arr = np.clip(arr * gain, 0, 255)
-        return arr.astype(np.uint8)
+        return cv2.LUT(img_rgb, _gain_lut(gain))
 
     def _vibrance_hsv_bg_protected(
         self, img_rgb, vib=0.18, bg_s_thresh=0.12, bg_v_thresh=0.90
     ):
         """Boost vibrance while protecting near-white backgrounds from shifts."""
-        # to HSV as float for math
-        hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV).astype(np.float32)
-        h, s, v = cv2.split(hsv)
-        s_n = s / 255.0
-        v_n = v / 255.0
-
-        # near-white background mask
-        bg = (s_n < bg_s_thresh) & (v_n > bg_v_thresh)
+        hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV)
+        s = hsv[..., 1]
 
-        # vibrance curve
-        s_new = np.clip((s_n + vib * (1.0 - s_n)) * 255.0, 0, 255)
+        # near-white background mask, via per-level lookups
+        low_s, high_v = _background_luts(bg_s_thresh, bg_v_thresh)
+        fg = ~(low_s[s] & high_v[hsv[..., 2]])
 
-        # protect background
-        s_new[bg] = s[bg]
-
-        # *** ensure SAME TYPE for merge ***
-        h_u8 = h.astype(np.uint8)
-        s_u8 = s_new.astype(np.uint8)
-        v_u8 = v.astype(np.uint8)
+        # vibrance curve, written in place outside the background
+        np.copyto(s, _vibrance_lut(vib)[s], where=fg)
+        return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
 
-        hsv_u8 = cv2.merge([h_u8, s_u8, v_u8])  # all uint8, same size
-        return cv2.cvtColor(hsv_u8, cv2.COLOR_HSV2RGB)
+    # Params tuned for watercolor; adjust if needed
+    STRENGTHS = {
+        "low": dict(
+            clahe_clip=1.4, vib=0.12, unsharp_amt=0.25, sigma=0.9, wp_pct=99.0
+        ),
+        "medium": dict(
+            clahe_clip=1.6, vib=0.18, unsharp_amt=0.35, sigma=1.0, wp_pct=99.2
+        ),
+        "high": dict(
+            clahe_clip=1.9, vib=0.25, unsharp_amt=0.45, sigma=1.1, wp_pct=99.4
+        ),
+    }
 
-    def enhance_image(self, pil_img: Image.Image, strength: str = "low") -> Image.Image:
+    def enhance_image(
+        self, pil_img: Union[Image.Image, np.ndarray], strength: str = "low"
+    ) -> Image.Image:
         """
         Safer enhancer for watercolor/foil napkins.
+        pil_img: a PIL image or an HxWx3 uint8 RGB array.
         strength: 'low' | 'medium' | 'high' (medium is recommended)
         """
-        # Params tuned for watercolor; adjust if needed
-        cfg = {
-            "low": dict(
-                clahe_clip=1.4, vib=0.12, unsharp_amt=0.25, sigma=0.9, wp_pct=99.0
-            ),
-            "medium": dict(
-                clahe_clip=1.6, vib=0.18, unsharp_amt=0.35, sigma=1.0, wp_pct=99.2
-            ),
-            "high": dict(
-                clahe_clip=1.9, vib=0.25, unsharp_amt=0.45, sigma=1.1, wp_pct=99.4
-            ),
-        }[strength]
-
-        img = pil_img.convert("RGB")
-        rgb = np.array(img)
-
-        # 1) White-point gently (protect texture by not aiming full 255)
-        # rgb = PostProcessing._white_point(rgb, percentile=cfg["wp_pct"], target=245)
-        rgb = self._white_point_neutral(rgb, percentile=cfg["wp_pct"], target=255)
+        return self.enhance_many(pil_img, (strength,))[0]
+
+    def enhance_many(
+        self,
+        pil_img: Union[Image.Image, np.ndarray],
+        strengths: Tuple[str, ...] = ("low", "medium", "high"),
+    ) -> Tuple[Image.Image, ...]:
+        """
+        Enhance one image at several strengths, sharing the RGB decode and
+        the luminance percentile pass; only the per-strength stages repeat.
+        """
+        cfgs = [self.STRENGTHS[strength] for strength in strengths]
+        src = self._rgb_array(pil_img)
+
+        # 1) White-point gently (protect texture by not aiming full 255).
+        # Neutral-preserving: a single gain from the luminance percentile,
+        # with all strengths' percentiles taken in one pass.
+        # (per-channel alternative: PostProcessing._white_point, target=245)
+        pcts = np.percentile(_luminance(src), [cfg["wp_pct"] for cfg in cfgs])
 
+        def run(cfg, p):
+            rgb = cv2.LUT(src, _gain_lut(255 / max(p, 1.0)))
+            return Image.fromarray(self._enhance_white_balanced(rgb, cfg))
+
+        if len(cfgs) == 1:
+            return (run(cfgs[0], pcts[0]),)
+        return tuple(self._EXECUTOR.map(run, cfgs, pcts))
+
+    # Blend weight of the "high" result per strength in the fast mode.
+    INTERPOLATION = {"low": 0.4, "medium": 0.7, "high": 1.0}
+
+    def enhance_interpolated(
+        self,
+        pil_img: Union[Image.Image, np.ndarray],
+        strengths: Tuple[str, ...] = ("low", "medium", "high"),
+    ) -> Tuple[Image.Image, ...]:
+        """
+        Fast approximation of enhance_many: run the pipeline once at 'high'
+        and blend it with the untouched image for the weaker strengths.
+        """
+        src = self._rgb_array(pil_img)
+        high_img = self.enhance_many(src, ("high",))[0]
+        high = np.asarray(high_img)
+        out = []
+        for strength in strengths:
+            t = self.INTERPOLATION[strength]
+            if t >= 1.0:
+                out.append(high_img)
+            else:
+                out.append(Image.fromarray(cv2.addWeighted(src, 1 - t, high, t, 0)))
+        return tuple(out)
+
+    @staticmethod
+    def _rgb_array(img: Union[Image.Image, np.ndarray]) -> np.ndarray:
+        """Return img as an HxWx3 uint8 RGB array, copying only when needed."""
+        if isinstance(img, np.ndarray):
+            return img
+        # RGB inputs (the decode paths keep them RGB) skip the conversion
+        return np.asarray(img if img.mode == "RGB" else img.convert("RGB"))
+
+    def _enhance_white_balanced(self, rgb: np.ndarray, cfg: dict) -> np.ndarray:
+        """Apply the CLAHE, vibrance and unsharp stages to a white-balanced array."""
         # 2) Local contrast on L channel (CLAHE) with highlight protection
         lab = self._rgb_to_lab(rgb)
-        L, A, B = cv2.split(lab)
-        # protect highlight areas (avoid blowing paper emboss)
-        highlight_mask = (L > 235).astype(np.uint8) * 255
-        clahe = cv2.createCLAHE(clipLimit=cfg["clahe_clip"], tileGridSize=(8, 8))
-        L_enh = clahe.apply(L)
-        # blend back highlights
-        L = np.where(highlight_mask == 255, L, L_enh)
-        lab = cv2.merge([L, A, B])
+        # CLAHE needs a contiguous single-channel buffer; lab[..., 0] is a view
+        L = np.ascontiguousarray(lab[..., 0])
+        L_enh = _clahe(cfg["clahe_clip"]).apply(L)
+        # write back in place, protecting highlight areas (paper emboss)
+        np.copyto(lab[..., 0], L_enh, where=L <= 235)
         rgb = self._lab_to_rgb(lab)
 
         # 3) Vibrance (not plain saturation) to keep pastels clean
         # rgb = PostProcessing._vibrance_hsv(rgb, vib=cfg["vib"])
         rgb = self._vibrance_hsv_bg_protected(rgb, vib=cfg["vib"])
 
-        # 4) Very light unsharp mask
-        rgb = self._unsharp(rgb, amount=cfg["unsharp_amt"], sigma=cfg["sigma"])
-
-        # 5) Final clamp and return
-        rgb = np.clip(rgb, 0, 255).astype(np.uint8)
-        return Image.fromarray(rgb)
+        # 4) Very light unsharp mask, written back into rgb (already uint8,
+        # so addWeighted saturates and no final clamp pass is needed)
+        self._unsharp(
+            rgb,
+            amount=cfg["unsharp_amt"],
+            sigma=cfg["sigma"],
+            blur_buf=np.empty_like(rgb),
+            dst=rgb,
+        )
+        return rgb
 
     def apply_post_processing(
         self, img: Image.Image
@@ -150,9 +252,12 @@ class PostProcessing:
         """
         try:
             logger.info(f"Applying post-processing to image.")
-            enhanced_img_l = self.enhance_image(img, strength="low")
-            enhanced_img_m = self.enhance_image(img, strength="medium")
-            enhanced_img_h = self.enhance_image(img, strength="high")
+            enhance = (
+                self.enhance_interpolated if self.mode == "fast" else self.enhance_many
+            )
+            enhanced_img_l, enhanced_img_m, enhanced_img_h = enhance(
+                img, ("low", "medium", "high")
+            )
             return enhanced_img_l, enhanced_img_m, enhanced_img_h
         except Exception as e:
             logger.error(f"Exception occurred in Post Processing: {e}")
@@ -0,0 +1,75 @@
+"""Thread-safe in-process caches shared across requests."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class LRUCache:
+    """Small thread-safe LRU map for memoizing results across requests.
+
+    Holds at most maxsize entries and, when maxbytes is given, at most that
+    many bytes as measured by weigh(value). Values heavier than the whole
+    budget are not cached.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        maxbytes: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        """Create an empty cache with the given entry and byte limits."""
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._weigh = weigh or (lambda value: 0)
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._weights: dict = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value (marking it recent), or None on a miss."""
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Any, value: Any) -> None:
+        """Store a value, evicting least recently used entries past the limits."""
+        weight = self._weigh(value)
+        with self._lock:
+            self._pop(key)
+            if self.maxbytes is not None and weight > self.maxbytes:
+                return
+            self._data[key] = value
+            self._weights[key] = weight
+            self._total += weight
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self._total > self.maxbytes
+            ):
+                self._pop(next(iter(self._data)))
+
+    def pop(self, key: Any) -> None:
+        """Drop the entry for key if present."""
+        with self._lock:
+            self._pop(key)
+
+    def keys(self) -> list:
+        """Snapshot of the cached keys, least recently used first."""
+        with self._lock:
+            return list(self._data)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self._total = 0
+
+    def _pop(self, key: Any) -> None:
+        """Remove key if present; the caller holds the lock."""
+        if key in self._data:
+            del self._data[key]
+            self._total -= self._weights.pop(key)
@@ -0,0 +1,103 @@
+"""Process-wide HTTP connection pool shared by the model provider SDKs."""
+
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.utility.logger import AppLogger
+
+logger = AppLogger.get_logger(__name__)
+
+
+class HttpClients:
+    """
+    Lazily created, shared httpx clients (sync and async), plus a pooled
+    requests.Session for the direct image download/edit calls.
+
+    The Gemini and OpenAI SDKs otherwise open a fresh connection pool per
+    client instance, paying a TCP/TLS handshake on every request. Passing
+    this client to them keeps connections alive across requests.
+
+    Usage:
+        client = HttpClients.get()
+        aclient = HttpClients.get_async()
+        session = HttpClients.get_session()
+        ...
+        HttpClients.close()  # on application shutdown
+        await HttpClients.aclose()
+    """
+
+    _client: Optional[httpx.Client] = None
+    _async_client: Optional[httpx.AsyncClient] = None
+    _session: Optional[requests.Session] = None
+
+    @classmethod
+    def get(cls) -> httpx.Client:
+        """Return the shared client, creating it on first use."""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=100, max_keepalive_connections=50
+                ),
+                # image generation can legitimately take close to a minute
+                timeout=httpx.Timeout(120.0, connect=10.0),
+                transport=httpx.HTTPTransport(retries=2),
+                follow_redirects=True,
+            )
+        return cls._client
+
+    @classmethod
+    def get_async(cls) -> httpx.AsyncClient:
+        """Return the shared async client used by the SDKs' aio surfaces."""
+        if cls._async_client is None or cls._async_client.is_closed:
+            cls._async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=100, max_keepalive_connections=50
+                ),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+                transport=httpx.AsyncHTTPTransport(retries=2),
+                follow_redirects=True,
+            )
+        return cls._async_client
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """
+        Return the shared requests session, creating it on first use.
+        Idempotent requests retry briefly on connection errors and 5xx/429.
+        """
+        if cls._session is None:
+            retry = Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=(429, 502, 503, 504),
+            )
+            adapter = HTTPAdapter(
+                pool_connections=8, pool_maxsize=16, max_retries=retry
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            cls._session = session
+        return cls._session
+
+    @classmethod
+    def close(cls) -> None:
+        """Close the shared clients if they were ever opened."""
+        if cls._client is not None and not cls._client.is_closed:
+            logger.info("Closing shared HTTP client")
+            cls._client.close()
+        cls._client = None
+        if cls._session is not None:
+            cls._session.close()
+        cls._session = None
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the shared async client if it was ever opened."""
+        if cls._async_client is not None and not cls._async_client.is_closed:
+            logger.info("Closing shared async HTTP client")
+            await cls._async_client.aclose()
+        cls._async_client = None
@@ -1,9 +1,12 @@
 """Shared logging configuration with colored console output and file support."""
 
+import atexit
 import logging
+from queue import SimpleQueue
 from pathlib import Path
 from logging import Logger
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
 
 
 # ANSI color codes for terminal
@@ -52,6 +55,7 @@ class AppLogger:
     """
 
     _configured: bool = False
+    _listener: Optional[QueueListener] = None
 
     @classmethod
     def init(
@@ -63,6 +67,9 @@ class AppLogger:
         """
         Initialize root logger with colored console handler and optional file handler.
         Safe to call multiple times – only configures once.
+
+        Records go through a queue and a listener thread writes them out,
+        so request paths never block on console or file I/O.
         """
         if cls._configured:
             return
@@ -76,6 +83,8 @@ class AppLogger:
         for handler in root_logger.handlers[:]:
             root_logger.removeHandler(handler)
 
+        handlers: List[logging.Handler] = []
+
         # Console handler with colors
         console_handler = logging.StreamHandler()
         console_handler.setLevel(level)
@@ -83,7 +92,7 @@ class AppLogger:
         console_format = "%(colored_levelname)s %(name)s | %(message)s"
         console_formatter = ColorFormatter(console_format)
         console_handler.setFormatter(console_formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
         # Optional file handler (no colors)
         if log_to_file:
@@ -105,7 +114,14 @@ class AppLogger:
                 datefmt="%Y-%m-%d %H:%M:%S",
             )
             file_handler.setFormatter(file_formatter)
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        queue: SimpleQueue = SimpleQueue()
+        root_logger.addHandler(QueueHandler(queue))
+        cls._listener = QueueListener(queue, *handlers, respect_handler_level=True)
+        cls._listener.start()
+        # Flush whatever is still queued when the interpreter exits.
+        atexit.register(cls._listener.stop)
 
     @staticmethod
     def get_logger(name: Optional[str] = None) -> Logger:
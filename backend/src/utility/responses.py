@@ -0,0 +1,116 @@
+"""Response classes shared by the FastAPI application."""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+import ormsgpack
+from fastapi import Response, status
+from fastapi.responses import JSONResponse
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson straight to bytes.
+
+    Avoids the stdlib encoder's intermediate ``str`` and UTF-8 re-encode,
+    which dominate when payloads carry multi-megabyte base64 image strings.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the response content to JSON bytes."""
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+class MsgPackResponse(Response):
+    """MessagePack response rendered with ormsgpack.
+
+    ``bytes`` values travel as native binary, so image data needs neither
+    base64 expansion nor JSON string escaping.
+    """
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the response content to MessagePack bytes."""
+        return ormsgpack.packb(
+            content,
+            option=ormsgpack.OPT_NON_STR_KEYS | ormsgpack.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def parse_byte_range(
+    header: Optional[str], total: int
+) -> Optional[Tuple[int, int]]:
+    """
+    Resolve a single-range ``Range`` header to inclusive (start, end) offsets.
+
+    Returns None when the whole body should be sent (no header, multiple
+    ranges, or a malformed value) and raises ValueError when the range
+    cannot be satisfied for a body of ``total`` bytes.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), total - 1) if last else total - 1
+    else:
+        # Suffix range: the final N bytes.
+        start, end = max(total - int(last), 0), total - 1
+    if start > end or start >= total:
+        raise ValueError(f"Range {header!r} not satisfiable for {total} bytes")
+    return start, end
+
+
+def bytes_response(
+    content: bytes,
+    media_type: str,
+    range_header: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Send an in-memory body, honouring a single byte ``Range`` like
+    FileResponse does for files on disk (206 slice, or 416 when out of range).
+    """
+    total = len(content)
+    headers = {**(headers or {}), "Accept-Ranges": "bytes"}
+    try:
+        byte_range = parse_byte_range(range_header, total)
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{total}"
+        return Response(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            headers=headers,
+        )
+    if byte_range is None:
+        return Response(content=content, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    return Response(
+        content=content[start : end + 1],
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header covers etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """304 answer to a conditional GET; headers should carry the ETag."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -3,16 +3,57 @@
 import io
 import os
 import yaml
-import base64
+import string
+import pybase64
 from PIL import Image
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
 from src.utility.path_finder import Finder
-from src.models.generate import ImageItem
+from src.models.combination import ATTRIBUTES
+from src.models.generate import DEFAULT_CHOICE, ImageItem, normalize_choice
 from src.utility.logger import AppLogger
 
-ATTR_KEYS = ("color_palette", "pattern", "motif", "style", "finish")
+# The five design attributes, in canonical order (defined with the schemas).
+ATTR_KEYS = ATTRIBUTES
+# Wire format for base64 image payloads; callers can still ask for PNG.
+TRANSPORT_FORMAT = "WEBP"
 logger = AppLogger.get_logger(__name__)
 
+# libpng/zlib release the GIL, so PNG encodes genuinely overlap on threads.
+_ENCODE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="encode")
+
+
+@lru_cache(maxsize=256)
+def _slugify(s: str) -> str:
+    """Memoized slug builder; themes and specs repeat across requests."""
+    return "".join(c.lower() if c.isalnum() else "_" for c in s).strip("_")
+
+
+@lru_cache(maxsize=4)
+def _read_templates(full_path: str, mtime_ns: int) -> Dict[str, str]:
+    """Parse the template YAML once per on-disk version of the file."""
+    with open(full_path, "r") as f:
+        return yaml.safe_load(f)
+
+
+@lru_cache(maxsize=32)
+def compile_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Pre-parse a str.format template into (literal, field name) fragments."""
+    return tuple(
+        (literal, field) for literal, field, _, _ in string.Formatter().parse(template)
+    )
+
+
+def render_template(
+    compiled: Tuple[Tuple[str, Optional[str]], ...], values: Dict[str, Any]
+) -> str:
+    """Fill a compiled template by joining its fragments with the values."""
+    return "".join(
+        literal if field is None else f"{literal}{values[field]}"
+        for literal, field in compiled
+    )
+
 
 class Helper:
     """Provide reusable utilities for prompts, slugs, and image encoding.
@@ -33,12 +74,12 @@ class Helper:
         config_dir = self.path.get_directory("config")
         full_path = os.path.join(config_dir, filename)
         try:
-            with open(full_path, "r") as f:
-                data = yaml.safe_load(f)
+            data = _read_templates(full_path, os.stat(full_path).st_mtime_ns)
         except Exception as e:
             logger.warning(
                 f"Unable to open file on path: {full_path}, got exception as {e}"
             )
+            data = {}
 
         template_map = {
             "napkin": "NAPKIN_TEMPLATE",
@@ -63,26 +104,61 @@ class Helper:
 
     def _strip_defaults(self, values: Dict[str, Any]) -> Dict[str, str]:
         """Remove any attributes still marked as 'default' from the mapping."""
-        cleaned: Dict[str, str] = {}
-        for key in ATTR_KEYS:
-            val = values.get(key)
-            if (
-                isinstance(val, str)
-                and val.strip()
-                and val.strip().lower() != "default"
-            ):
-                cleaned[key] = val.strip()
-        return cleaned
+        normalized = ((key, normalize_choice(values.get(key))) for key in ATTR_KEYS)
+        return {
+            key: val
+            for key, val in normalized
+            if isinstance(val, str) and val and val != DEFAULT_CHOICE
+        }
 
     def _slug(self, s: str) -> str:
         """Create a filesystem-safe slug from the provided string."""
-        return "".join(c.lower() if c.isalnum() else "_" for c in s).strip("_")
+        return _slugify(s)
 
-    def from_pil(self, img: Image.Image, fmt: str = "PNG") -> ImageItem:
+    def pil_to_bytes(self, img: Image.Image, fmt: str = "PNG") -> bytes:
+        """Encode a PIL image into raw bytes of the requested format."""
+        # compress_level=1 is several times faster than libpng's default of 6;
+        # these bytes only travel to the browser or a model API, not to disk.
+        save_kwargs = {
+            "PNG": {"compress_level": 1},
+            "WEBP": {"quality": 85, "method": 4},
+        }.get(fmt.upper(), {})
+        with io.BytesIO() as buf:
+            img.save(buf, format=fmt, **save_kwargs)
+            return buf.getvalue()
+
+    def from_pil(self, img: Image.Image, fmt: str = TRANSPORT_FORMAT) -> ImageItem:
         """Serialize a PIL image into base64-encoded ImageItem."""
-        buf = io.BytesIO()
-        img.save(buf, format=fmt)
-        return ImageItem(
+        # Both fields are produced here, so skip re-validating the base64 blob.
+        return ImageItem.model_construct(
             mime_type=f"image/{fmt.lower()}",
-            data_b64=base64.b64encode(buf.getvalue()).decode("utf-8"),
+            data_b64=pybase64.b64encode_as_string(self.pil_to_bytes(img, fmt)),
         )
+
+    def raw_from_pil(
+        self, img: Image.Image, fmt: str = TRANSPORT_FORMAT
+    ) -> Dict[str, Any]:
+        """Encode a PIL image as {"mime_type", "data"} with raw bytes, no base64."""
+        return {
+            "mime_type": f"image/{fmt.lower()}",
+            "data": self.pil_to_bytes(img, fmt),
+        }
+
+    def submit_from_pil(
+        self, img: Image.Image, fmt: str = TRANSPORT_FORMAT
+    ) -> Future:
+        """Schedule a PIL image encode on the shared pool and return its future."""
+        return _ENCODE_POOL.submit(self.from_pil, img, fmt)
+
+    def from_pil_many(
+        self,
+        images: Iterable[Image.Image],
+        fmt: str = TRANSPORT_FORMAT,
+        raw: bool = False,
+    ) -> List[Union[ImageItem, Dict[str, Any]]]:
+        """
+        Serialize several PIL images concurrently, preserving input order.
+        raw: return raw_from_pil dicts instead of base64 ImageItems.
+        """
+        encode = self.raw_from_pil if raw else self.from_pil
+        return list(_ENCODE_POOL.map(lambda img: encode(img, fmt), images))
@@ -1,10 +1,13 @@
 """Unit tests for LLMCombiner generation and fallback behavior."""
 
 import json
+import asyncio
+import time
 
 import pytest
 
-from src.services.combination_service.llm_combiner import LLMCombiner
+from src.services.combination_service import llm_combiner
+from src.services.combination_service.llm_combiner import GeminiClient, LLMCombiner
 
 
 def test_is_default_helper():
@@ -95,3 +98,221 @@ def test_generate_falls_back_when_llm_fails():
   # Locked motif/finish should be preserved in all fallback combos
   assert all(c["motif"] == "bird" for c in combos)
   assert all(c["finish"] == "matte" for c in combos)
+
+
+def test_generate_rationales_keeps_order_and_isolates_failures(monkeypatch):
+  client = GeminiClient()
+
+  async def fake_rationale(type, combination, model="gemini-2.0-flash", tier=None):
+    if combination["motif"] == "bad":
+      raise RuntimeError("boom")
+    await asyncio.sleep(0.01 if combination["motif"] == "slow" else 0)
+    return f"{type}:{combination['motif']}"
+
+  monkeypatch.setattr(client, "agenerate_rationale", fake_rationale)
+  combos = [{"motif": "slow"}, {"motif": "bad"}, {"motif": "fast"}]
+  results = asyncio.run(client.generate_rationales("napkin", combos))
+
+  assert results[0] == "napkin:slow"
+  assert isinstance(results[1], RuntimeError)
+  assert results[2] == "napkin:fast"
+
+
+def test_generate_rationales_parallel_keeps_order(monkeypatch):
+  client = GeminiClient()
+
+  def fake_rationale(type, combination, model="gemini-2.0-flash", tier=None):
+    time.sleep(0.01 if combination["motif"] == "slow" else 0)
+    return f"{type}:{combination['motif']}"
+
+  monkeypatch.setattr(client, "generate_rationale", fake_rationale)
+  combos = [{"motif": "slow"}, {"motif": "fast"}, {"motif": "mid"}]
+  results = client.generate_rationales_parallel("napkin", combos)
+
+  assert results == ["napkin:slow", "napkin:fast", "napkin:mid"]
+
+
+def test_generate_caches_valid_llm_combinations():
+  llm_combiner._COMBINATION_CACHE.clear()
+  selections = {k: "Default" for k in ("color_palette", "pattern", "motif", "style", "finish")}
+  catalog = {
+      "color_palette": ["pastel", "neon", "earthy"],
+      "pattern": ["stripes", "dots", "plaid"],
+      "motif": ["stars", "moons", "leaf"],
+      "style": ["modern", "vintage", "classic"],
+      "finish": ["matte", "glossy", "satin"],
+  }
+  calls = []
+
+  def counting_llm_fn(prompt: str) -> str:
+    calls.append(prompt)
+    combos = [
+        {k: catalog[k][i] for k in catalog} | {"rationale": f"r{i}"}
+        for i in range(3)
+    ]
+    return json.dumps({"combinations": combos})
+
+  combiner = LLMCombiner(llm_fn=counting_llm_fn)
+  first = combiner.generate("napkin", selections, catalog)
+  first[0]["motif"] = "mutated"
+  second = combiner.generate("napkin", selections, catalog)
+
+  assert len(calls) == 1
+  assert second[0]["motif"] == "stars"
+
+
+def test_generate_sends_static_prefix_separately_when_supported():
+  llm_combiner._COMBINATION_CACHE.clear()
+  selections = {"color_palette": "Default", "pattern": "dots", "motif": "Default", "style": "Default", "finish": "Default"}
+  catalog = {"color_palette": ["pastel"], "pattern": ["dots"], "motif": ["stars"], "style": ["modern"], "finish": ["matte"]}
+  seen = {}
+
+  def prefix_llm_fn(prefix: str, tail: str) -> str:
+    seen["prefix"], seen["tail"] = prefix, tail
+    raise RuntimeError("offline")
+
+  combiner = LLMCombiner(llm_fn=lambda p: "", prefix_llm_fn=prefix_llm_fn)
+  combiner.generate("napkin", selections, catalog)
+
+  assert '"motif": [' in seen["prefix"]
+  assert "napkin" not in seen["prefix"]
+  assert seen["tail"].startswith(llm_combiner.PROMPT_SPLIT_MARKER)
+  assert '"pattern": "dots"' in seen["tail"]
+
+
+def test_duplicate_llm_combos_are_filled_with_unseen_catalog_picks():
+  llm_combiner._COMBINATION_CACHE.clear()
+  selections = {"color_palette": "Default", "pattern": "dots", "motif": "stars", "style": "modern", "finish": "matte"}
+  catalog = {"color_palette": ["pastel", "neon", "earthy"], "pattern": ["dots"], "motif": ["stars"], "style": ["modern"], "finish": ["matte"]}
+  dup = {"color_palette": "pastel", "rationale": "same"}
+
+  combiner = LLMCombiner(llm_fn=lambda p: json.dumps({"combinations": [dup, dup, dup]}))
+  combos = combiner.generate("napkin", selections, catalog)
+
+  assert sorted(c["color_palette"] for c in combos) == ["earthy", "neon", "pastel"]
+  assert combos[0]["rationale"] == "same"
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '{"combinations": []}',
+        '```json\n{"combinations": []}\n```',
+        '  ```\n{"combinations": []}```  ',
+    ],
+)
+def test_fence_regex_unwraps_only_full_fences(raw):
+  m = llm_combiner._FENCE_RE.match(raw)
+  body = m.group(1) if m else raw
+  assert json.loads(body) == {"combinations": []}
+
+
+def test_generate_batch_offline_submits_one_job_and_keeps_order():
+  llm_combiner._COMBINATION_CACHE.clear()
+  catalog = {"color_palette": ["pastel", "neon", "earthy"], "pattern": ["dots"], "motif": ["stars"], "style": ["modern"], "finish": ["matte"]}
+  base = {"color_palette": "Default", "motif": "stars", "style": "modern", "finish": "matte"}
+  selections_list = [dict(base, pattern="dots"), dict(base, pattern="Default")]
+  jobs = []
+
+  def batch_llm_fn(prompts):
+    jobs.append(prompts)
+    combos = [{"color_palette": c, "pattern": "dots"} for c in catalog["color_palette"]]
+    return [json.dumps({"combinations": combos}), None]
+
+  combiner = LLMCombiner(llm_fn=lambda p: "", batch_llm_fn=batch_llm_fn)
+  results = combiner.generate_batch("napkin", selections_list, catalog, offline=True)
+
+  assert len(jobs) == 1 and len(jobs[0]) == 2
+  assert [c["color_palette"] for c in results[0]] == ["pastel", "neon", "earthy"]
+  # the failed prompt falls back locally instead of sinking the batch
+  assert results[1][0]["rationale"] == "balanced rotation across defaults."
+
+
+def test_generate_retries_transient_llm_errors(monkeypatch):
+  llm_combiner._COMBINATION_CACHE.clear()
+  monkeypatch.setattr(LLMCombiner._call_llm.retry, "sleep", lambda _: None)
+  catalog = {k: ["a", "b", "c"] for k in ("color_palette", "pattern", "motif", "style", "finish")}
+  selections = {k: "Default" for k in catalog}
+  attempts = []
+
+  def flaky_llm_fn(prompt: str) -> str:
+    attempts.append(prompt)
+    if len(attempts) < 3:
+      raise TimeoutError("slow upstream")
+    combos = [{k: v for k in catalog} for v in "abc"]
+    return json.dumps({"combinations": combos})
+
+  combos = LLMCombiner(llm_fn=flaky_llm_fn).generate("napkin", selections, catalog)
+
+  assert len(attempts) == 3
+  assert [c["motif"] for c in combos] == ["a", "b", "c"]
+
+
+def test_generate_cache_ignores_selection_key_order():
+  llm_combiner._COMBINATION_CACHE.clear()
+  catalog = {"color_palette": ["pastel", "neon", "earth"], "pattern": ["dots"], "motif": ["stars"], "style": ["modern"], "finish": ["matte"]}
+  selections = {"color_palette": "Default", "pattern": "dots", "motif": "Default", "style": "Default", "finish": "Default"}
+  reordered = dict(reversed(list(selections.items())))
+  calls = []
+
+  def counting_llm_fn(prompt: str) -> str:
+    calls.append(prompt)
+    combos = [
+        {k: catalog[k][0] for k in catalog} | {"color_palette": c, "rationale": "r"}
+        for c in catalog["color_palette"]
+    ]
+    return json.dumps({"combinations": combos})
+
+  combiner = LLMCombiner(llm_fn=counting_llm_fn)
+  first = combiner.generate("napkin", selections, catalog)
+  second = combiner.generate("napkin", reordered, catalog)
+
+  assert len(calls) == 1
+  assert second == first
+
+
+def test_ensure_cache_creates_once_without_holding_shared_lock():
+  import threading
+  from types import SimpleNamespace
+
+  llm_combiner._CONTEXT_CACHES.clear()
+  created = []
+
+  def create(model, config):
+    assert not llm_combiner._CONTEXT_CACHE_LOCK.locked()
+    time.sleep(0.05)
+    created.append(model)
+    return SimpleNamespace(name="cachedContents/1")
+
+  client = SimpleNamespace(caches=SimpleNamespace(create=create))
+  names = []
+  threads = [
+      threading.Thread(
+          target=lambda: names.append(
+              GeminiClient().ensure_cache(client, "static prefix", "m")
+          )
+      )
+      for _ in range(4)
+  ]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+
+  assert created == ["m"]
+  assert names == ["cachedContents/1"] * 4
+
+
+def test_generate_falls_back_when_duplicates_cannot_be_replaced():
+  llm_combiner._COMBINATION_CACHE.clear()
+  selections = {"color_palette": "Default", "pattern": "Default", "motif": "stars", "style": "modern", "finish": "matte"}
+  catalog = {"color_palette": ["pastel", "neon"], "pattern": ["dots"], "motif": ["stars"], "style": ["modern"], "finish": ["matte"]}
+
+  def duplicate_llm_fn(prompt: str) -> str:
+    combo = {k: catalog[k][0] for k in catalog} | {"rationale": "r"}
+    return json.dumps({"combinations": [combo] * 3})
+
+  combos = LLMCombiner(llm_fn=duplicate_llm_fn).generate("napkin", selections, catalog)
+
+  assert [c["color_palette"] for c in combos] == ["pastel", "neon"]
+  assert all(c["rationale"] == llm_combiner.FALLBACK_RATIONALE for c in combos)
@@ -1,5 +1,13 @@
 """Unit tests for utility helpers used across services."""
 
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from src.utility.cache import LRUCache
+from src.utility.responses import bytes_response, etag_matches, parse_byte_range
 from src.utility.utils import Helper
 
 
@@ -28,3 +36,87 @@ def test_slug_produces_safe_strings():
     assert helper._slug("Hello World!") == "hello_world"
     assert helper._slug("A/B\\C") == "a_b_c"
     assert helper._slug(" already_slug ") == "already_slug"
+
+
+def test_from_pil_round_trips_png():
+    helper = Helper()
+    img = Image.new("RGBA", (4, 4), (255, 0, 0, 255))
+
+    item = helper.from_pil(img, fmt="PNG")
+
+    assert item.mime_type == "image/png"
+    decoded = Image.open(io.BytesIO(base64.b64decode(item.data_b64)))
+    assert decoded.size == (4, 4)
+
+
+def test_from_pil_defaults_to_webp():
+    helper = Helper()
+    img = Image.new("RGBA", (4, 4), (0, 128, 255, 255))
+
+    item = helper.from_pil(img)
+
+    assert item.mime_type == "image/webp"
+    decoded = Image.open(io.BytesIO(base64.b64decode(item.data_b64)))
+    assert decoded.format == "WEBP"
+
+
+def test_from_pil_many_preserves_order():
+    helper = Helper()
+    images = [Image.new("RGB", (size, size)) for size in (2, 3, 5)]
+
+    items = helper.from_pil_many(images)
+
+    assert [item.data_b64 for item in items] == [
+        helper.from_pil(img).data_b64 for img in images
+    ]
+
+
+def test_parse_byte_range_forms():
+    assert parse_byte_range(None, 100) is None
+    assert parse_byte_range("bytes=0-9", 100) == (0, 9)
+    assert parse_byte_range("bytes=90-", 100) == (90, 99)
+    assert parse_byte_range("bytes=-10", 100) == (90, 99)
+    assert parse_byte_range("bytes=50-500", 100) == (50, 99)
+    # Multiple ranges and junk fall back to the full body
+    assert parse_byte_range("bytes=0-1,5-6", 100) is None
+    assert parse_byte_range("items=0-1", 100) is None
+    with pytest.raises(ValueError):
+        parse_byte_range("bytes=100-", 100)
+
+
+def test_bytes_response_serves_partial_content():
+    full = bytes_response(b"0123456789", "image/png")
+    part = bytes_response(b"0123456789", "image/png", range_header="bytes=2-4")
+    unsatisfiable = bytes_response(b"0123456789", "image/png", "bytes=20-")
+
+    assert full.status_code == 200
+    assert full.headers["accept-ranges"] == "bytes"
+    assert part.status_code == 206
+    assert part.body == b"234"
+    assert part.headers["content-range"] == "bytes 2-4/10"
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */10"
+
+
+def test_etag_matches_if_none_match_forms():
+    assert not etag_matches(None, '"abc"')
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+
+
+def test_lru_cache_evicts_by_entries_and_bytes():
+    cache = LRUCache(maxsize=3, maxbytes=10, weigh=len)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")  # 12 bytes: evicts "b", the least recent
+    cache.put("big", b"x" * 11)  # over the whole budget: not cached
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"1234"
+    assert cache.get("big") is None
+    cache.pop("a")
+    assert cache.keys() == ["c"]
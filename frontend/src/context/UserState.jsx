@@ -270,7 +270,7 @@ const UserState = ({ children }) => {
 
   async function streamGenerateDesigns(
     payload,
-    { onPrompt, onVariant, onSummary, onError, onDone, signal } = {}
+    { onPrompt, onRationale, onVariant, onSummary, onError, onDone, signal } = {}
   ) {
     const controller = new AbortController();
     const response = await fetch(`${API_BASE_URL}/generate/stream`, {
@@ -299,6 +299,9 @@ const UserState = ({ children }) => {
           case "prompt":
             onPrompt?.(event.data);
             break;
+          case "rationale":
+            onRationale?.(event.data);
+            break;
           case "image_variant":
             onVariant?.(event.data);
             break;
@@ -121,9 +121,31 @@ const Selections = (props) => {
       selections,
       catalog,
     };
+    // rationale text received so far this run, per image index
+    const streamedRationale = {};
     try {
       const stream = await streamGenerateDesigns(payload, {
         onPrompt: () => {},
+        onRationale: ({ index, delta }) => {
+          const targetIndex =
+            Number.isInteger(index) && index >= 1 ? index - 1 : 0;
+          const text = (streamedRationale[targetIndex] || "") + (delta || "");
+          streamedRationale[targetIndex] = text;
+          setImageSets((prev) => {
+            const next = [...prev];
+            const existing = next[targetIndex] || {
+              key: `image-${targetIndex + 1}`,
+              combo: selections,
+              variants: {},
+              rationale: "",
+              theme: payload.theme,
+              type: payload.enhancement,
+              id: null,
+            };
+            next[targetIndex] = { ...existing, rationale: text };
+            return next;
+          });
+        },
         onVariant: ({ index, id, variant, image, rationale, combo }) => {
           let resolvedIndex = 0;
           setImageSets((prev) => {